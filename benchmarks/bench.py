@@ -0,0 +1,303 @@
+"""
+Microbenchmarks of the fetch, parse, filter and sort stages.
+
+The pages are served by a local HTTP server, so no request leaves the machine.
+Two kinds of pages are measured:
+
+* recorded: real FAPESP listing pages saved in benchmarks/pages/ by --record;
+* synthetic: generated listings with 10, 1000 and 10000 <li> items.
+
+Usage:
+
+    python3 benchmarks/bench.py                      # run, print and save results
+    python3 benchmarks/bench.py --output base.json
+    python3 benchmarks/bench.py --compare base.json  # also print the ratio to a previous run
+    python3 benchmarks/bench.py --record             # download the live pages into benchmarks/pages/
+"""
+import os
+import sys
+import gc
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "src"))
+
+import fapesp_opportunities.modules.fapesp as fapesp
+import fapesp_opportunities.modules.configure as configure
+import fapesp_opportunities.modules.pipeline as pipeline
+from fapesp_opportunities.modules.parsememo import ParseMemo
+
+PAGES_DIR = os.path.join(HERE, "pages")
+SIZES = [10, 1000, 10000]
+LIVE_URL = "https://fapesp.br/oportunidades/mais-recentes/"
+BASE_URL = "https://fapesp.br"
+
+TITLES = ["Bolsa de PD em visão computacional",
+          "Bolsa de Doutorado em medicina",
+          "Bolsa de Mestrado em Computação",
+          "Auxílio à pesquisa",
+          "Bolsas de PD em redes neurais"]
+
+
+def synthetic_listing(n):
+    """
+    Returns a listing page with n items in the layout of the FAPESP site;
+    every seventh item is closed.
+    """
+    items = []
+    for i in range(n):
+        title = TITLES[i % len(TITLES)]
+        status = "aberta" if i % 7 != 6 else "encerrada"
+        items.append(f'''<li class="box_col {status}">
+<a class="link_col" href="/oportunidades/{title.lower().replace(' ', '_')}/{1000 + i}/">
+<strong class="title">{title} {i}</strong>
+<span class="text-resumo">Projeto sobre sinais e machine learning número {i} aplicado à engenharia elétrica</span>
+<span class="info"><strong>Cidade:</strong> São Paulo<br/><strong>Instituição:</strong> Universidade de São Paulo (USP)<br/>
+<strong>Inscrições até:</strong> {1 + i % 28:02d}/{1 + i % 12:02d}/2099</span></a></li>''')
+    return f'''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Oportunidades - FAPESP</title><script>var x = 1;</script></head><body>
+<header><nav><ul class="menu"><li><a href="/">Início</a></li></ul></nav></header>
+<main><ul class="list">{"".join(items)}</ul>
+<div class="pagination"><a href="/oportunidades/mais-recentes/?page=1">1</a></div></main>
+<footer>FAPESP</footer></body></html>'''
+
+
+def recorded_pages():
+    # Nome do arquivo -> HTML, para as páginas salvas com --record
+    pages = {}
+    if os.path.isdir(PAGES_DIR):
+        for name in sorted(os.listdir(PAGES_DIR)):
+            if name.endswith(".html"):
+                with open(os.path.join(PAGES_DIR, name), 'r', encoding='utf-8') as f:
+                    pages[name[:-5]] = f.read()
+    return pages
+
+
+def record_pages(url=LIVE_URL, max_pages=3):
+    """
+    Downloads the first listing pages of the live site into benchmarks/pages/.
+    """
+    from fapesp_opportunities.modules.network import fetch
+
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    urls = [url] + fapesp.find_page_urls(fetch(url).text, url)[:max_pages - 1]
+    for k, page_url in enumerate(urls, 1):
+        path = os.path.join(PAGES_DIR, f"recorded-{k}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(fetch(page_url).text)
+        print(f"{page_url} -> {path}")
+
+
+################################################################################
+# Local HTTP stand-in
+
+class _Handler(BaseHTTPRequestHandler):
+    pages = {}
+
+    def do_GET(self):
+        body = self.pages.get(self.path.split("?")[0])
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalServer:
+    """
+    Serves {path: html} from a thread on a free localhost port.
+    """
+    def __init__(self, pages):
+        handler = type("Handler", (_Handler,), {"pages": {p: h.encode('utf-8') for p, h in pages.items()}})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+################################################################################
+# Medição
+
+def measure(func, min_time=0.5, max_rounds=50):
+    """
+    Calls func repeatedly (at least once and until min_time seconds have passed)
+    and returns statistics of the durations in seconds.
+    """
+    times = []
+    gc.collect()
+    start = time.perf_counter()
+    while len(times) < max_rounds and (not times or time.perf_counter() - start < min_time):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    return {
+        "rounds": len(times),
+        "min": times[0],
+        "median": times[len(times) // 2],
+        "mean": sum(times) / len(times),
+        "max": times[-1],
+    }
+
+
+def _temp_config(directory, url):
+    path = os.path.join(directory, "config.json")
+    configure.verify_default_config(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        conf = json.load(f)
+    conf.update({"url": url, "crawl-pages": False, "cache-max-age": 0})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(conf, f, ensure_ascii=False)
+    return path
+
+
+def bench_page(name, html, server_url, min_time):
+    """
+    Runs every benchmark on one listing page and returns {benchmark: stats}.
+    """
+    url = f"{server_url}/{name}/"
+    conf = configure.DEFAULT_CONTENT
+    items = fapesp.get_open_opportunities(url)
+    records = fapesp.parse_opportunities(items, base_url=BASE_URL)
+    print(f"  {name}: {len(html) // 1024} KiB, {len(records)} open items", flush=True)
+
+    cases = {
+        "fetch/get_open_opportunities": lambda: fapesp.get_open_opportunities(url),
+        "fetch/fetch_opportunities": lambda: fapesp.fetch_opportunities(url, base_url=BASE_URL),
+        "fetch/iter_open_opportunities": lambda: list(fapesp.iter_open_opportunities(url, base_url=BASE_URL)),
+        "parse/parse_opportunity": lambda: fapesp.parse_opportunity(items[0], base_url=BASE_URL) if items else None,
+        "parse/parse_opportunities": lambda: fapesp.parse_opportunities(items, base_url=BASE_URL),
+        "parse/parse_opportunities-process": lambda: fapesp.parse_opportunities(items, base_url=BASE_URL, mode="process"),
+    }
+    for backend in fapesp.available_backends():
+        cases[f"parse/backend-{backend}"] = (lambda b=fapesp.get_backend(backend): b.parse(html, BASE_URL))
+
+    # Memo dos <li>: vazio (página inteira nova) e cheio (nenhum item mudou)
+    def parse_memo_cold():
+        fapesp.set_parse_memo(ParseMemo())
+        return fapesp._parse_listing(html, url, BASE_URL, False)
+    cases["parse/listing-memo-cold"] = parse_memo_cold
+    cases["parse/listing-memo-warm"] = lambda: fapesp._parse_listing(html, url, BASE_URL, False)
+    cases.update({
+        "filter/filter_grants_by_title": lambda: fapesp.filter_grants_by_title(records, conf["title-contents"]),
+        "filter/filter_grants_by_content": lambda: fapesp.filter_grants_by_content(records, conf["body-contents"]),
+        "sort/sort_by_deadline": lambda: fapesp.sort_by_deadline(records),
+    })
+
+    # Busca completa do programa, com banco e cache descartáveis
+    directory = tempfile.mkdtemp(prefix="fapesp-bench-")
+    try:
+        config_path = _temp_config(directory, url)
+        cases["pipeline/buscar_oportunidades"] = lambda: pipeline.buscar_oportunidades(config_path)
+        results = {}
+        for case, func in cases.items():
+            results[case] = measure(func, min_time=min_time)
+            results[case]["items"] = len(records)
+            print(f"    {case:<36} {results[case]['median'] * 1000:10.2f} ms", flush=True)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes=SIZES, min_time=0.5):
+    """
+    Runs the suite on the recorded pages and on synthetic pages of the given sizes.
+
+    Returns:
+        dict: Metadata and {page: {benchmark: stats}}.
+    """
+    pages = recorded_pages()
+    for n in sizes:
+        pages[f"synthetic-{n}"] = synthetic_listing(n)
+
+    results = {}
+    with LocalServer({f"/{name}/": html for name, html in pages.items()}) as server:
+        for name, html in pages.items():
+            results[name] = bench_page(name, html, server.url, min_time)
+
+    return {
+        "commit": _git_commit(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parser": fapesp.get_backend().name,
+        "results": results,
+    }
+
+
+def compare(current, previous, out=sys.stdout):
+    """
+    Prints the ratio of the median time of each benchmark to a previous run.
+    """
+    out.write(f"\nCompared with {previous.get('commit')} ({previous.get('date')}):\n")
+    for page, cases in current["results"].items():
+        old_cases = previous.get("results", {}).get(page, {})
+        for case, stats in cases.items():
+            if case in old_cases:
+                ratio = stats["median"] / old_cases[case]["median"]
+                out.write(f"  {page:<16} {case:<36} {ratio:6.2f}x\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks of the fetch/parse/filter/sort stages")
+    parser.add_argument("--output", default=None,
+                        help="JSON file of the results (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="JSON of a previous run to compare with")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                        help="number of <li> items of the synthetic pages")
+    parser.add_argument("--min-time", type=float, default=0.5,
+                        help="minimum seconds spent on each benchmark")
+    parser.add_argument("--record", action="store_true",
+                        help="save the live listing pages in benchmarks/pages/ and exit")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record_pages()
+        return 0
+
+    report = run(args.sizes, args.min_time)
+
+    output = args.output or os.path.join(HERE, "results", f"{report['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved in {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(report, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
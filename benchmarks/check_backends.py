@@ -0,0 +1,167 @@
+"""
+Checks that every way of parsing a listing page gives the same records.
+
+Each page of benchmarks/fixtures/ (and of benchmarks/pages/, when --record
+saved any) is parsed by:
+
+* every parser backend available here (selectolax, lxml, bs4-lxml, html.parser);
+* the memoized path, cold and warm (_parse_items with an empty ParseMemo);
+* the streaming path, fed in chunks of several sizes (the first cold, the
+  others through the memo filled by it);
+* ListingStream, downloading the page from a local HTTP server;
+* parse_opportunities() over the <li> blocks, serial and with a process pool.
+
+All of them must return the same records, folded fields included, and the
+same pagination links. The fixtures also have their expected records in a
+JSON file next to the HTML, so a change that affects every backend alike is
+caught too.
+
+Usage:
+
+    python3 benchmarks/check_backends.py            # exit status 1 on any difference
+    python3 benchmarks/check_backends.py --update   # rewrite the expected JSON files
+"""
+import os
+import sys
+import json
+import argparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "src"))
+
+import fapesp_opportunities.modules.fapesp as fapesp
+from fapesp_opportunities.modules.parsememo import ParseMemo
+
+from bench import LocalServer, recorded_pages, BASE_URL
+
+FIXTURES_DIR = os.path.join(HERE, "fixtures")
+PAGE_PATH = "/oportunidades/mais-recentes/"
+CHUNK_SIZES = [1, 7, 64, 16 * 1024]
+FIELDS = ["title", "body", "text", "link", "id", "city", "institute", "end_date", "deadline"]
+
+
+def fixture_pages():
+    # Nome do arquivo -> HTML, das páginas de benchmarks/fixtures/
+    pages = {}
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.endswith(".html"):
+            with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+                pages[name[:-5]] = f.read()
+    return pages
+
+
+def _values(records):
+    # Campos comparados: os de dump() e os normalizados usados pelos filtros
+    return [op.dump() + [op.folded_title, op.folded_text] for op in records]
+
+
+def _streamed(html, chunk_size):
+    listing = fapesp._StreamingListing(BASE_URL)
+    records = []
+    for i in range(0, len(html), chunk_size):
+        records += listing.feed(html[i:i + chunk_size])
+    return records + listing.close()
+
+
+def parse_all_ways(html, page_url):
+    """
+    Parses html in every supported way.
+
+    Returns:
+        dict: {way: (records as lists, pagination links or None)}.
+    """
+    results = {}
+    for name in fapesp.available_backends():
+        results["backend " + name] = (_values(fapesp.get_backend(name).parse(html, BASE_URL)), None)
+
+    fapesp.set_parse_memo(ParseMemo())
+    try:
+        results["memo cold"] = (_values(fapesp._parse_items(html, BASE_URL)), None)
+        results["memo warm"] = (_values(fapesp._parse_items(html, BASE_URL)), None)
+        fapesp.set_parse_memo(ParseMemo())
+        for chunk_size in CHUNK_SIZES:
+            results[f"stream {chunk_size}"] = (_values(_streamed(html, chunk_size)), None)
+        fapesp.set_parse_memo(None)
+        results["stream no memo"] = (_values(_streamed(html, 64)), None)
+    finally:
+        fapesp.set_parse_memo(ParseMemo(version=fapesp.RECORD_VERSION))
+
+    with LocalServer({PAGE_PATH: html}) as server:
+        stream = fapesp.ListingStream(server.url + PAGE_PATH, base_url=BASE_URL, with_pages=True)
+        records = list(stream)
+        # Os links da paginação apontam para o site, não para o servidor local
+        pages = [url.replace(server.url, BASE_URL) for url in stream.pages]
+        results["ListingStream"] = (_values(records), pages)
+
+    blocks = fapesp._split_items(html) or []
+    blocks = [b for b in blocks if fapesp._is_open_item(b[:b.index(">") + 1])]
+    results["parse_opportunities serial"] = (_values(fapesp.parse_opportunities(blocks, BASE_URL)), None)
+    # Repetidos para passar de PROCESS_MIN_ITEMS e de fato usar o pool
+    copies = fapesp.PROCESS_MIN_ITEMS
+    records = _values(fapesp.parse_opportunities(blocks * copies, BASE_URL, mode="process",
+                                                 chunk_size=max(1, len(blocks) * copies // 8), max_workers=2))
+    n = len(blocks)
+    results["parse_opportunities process"] = (records[:n] if records == records[:n] * copies else records, None)
+
+    results["find_page_urls"] = (None, fapesp.find_page_urls(html, page_url))
+    return results
+
+
+def check_page(name, html, expected=None, out=sys.stdout):
+    """
+    Compares every way of parsing a page with the first backend (and with expected).
+
+    Returns:
+        bool: True if they all agree.
+    """
+    page_url = BASE_URL + PAGE_PATH
+    results = parse_all_ways(html, page_url)
+    reference_way = "backend " + fapesp.available_backends()[0]
+    reference = results[reference_way][0]
+    reference_pages = results["find_page_urls"][1]
+
+    ok = True
+    if expected is not None and [r[:len(FIELDS)] for r in reference] != expected:
+        out.write(f"{name}: {reference_way} differs from the expected records\n")
+        ok = False
+    for way, (records, pages) in results.items():
+        if records is not None and records != reference:
+            out.write(f"{name}: {way} differs from {reference_way}\n")
+            for a, b in zip(reference + [None] * len(records), records + [None] * len(reference)):
+                if a != b:
+                    out.write(f"    {reference_way}: {a}\n    {way}: {b}\n")
+                    break
+            ok = False
+        if pages is not None and pages != reference_pages:
+            out.write(f"{name}: {way} pagination {pages} differs from find_page_urls {reference_pages}\n")
+            ok = False
+    out.write(f"{name}: {len(reference)} records, {len(reference_pages)} pages, "
+              f"{len(results)} ways: {'ok' if ok else 'FAILED'}\n")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Checks that every listing parser gives the same records")
+    parser.add_argument("--update", action="store_true",
+                        help="rewrite the expected records of the fixtures from the first backend")
+    args = parser.parse_args(argv)
+
+    ok = True
+    for name, html in fixture_pages().items():
+        expected_path = os.path.join(FIXTURES_DIR, name + ".json")
+        if args.update:
+            records = fapesp.get_backend(fapesp.available_backends()[0]).parse(html, BASE_URL)
+            with open(expected_path, 'w', encoding='utf-8') as f:
+                json.dump([dict(zip(FIELDS, op.dump())) for op in records], f, indent=2, ensure_ascii=False)
+                f.write("\n")
+        with open(expected_path, 'r', encoding='utf-8') as f:
+            expected = [[record[k] for k in FIELDS] for record in json.load(f)]
+        ok = check_page(name, html, expected) and ok
+
+    for name, html in recorded_pages().items():
+        ok = check_page(name, html) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
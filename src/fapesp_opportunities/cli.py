@@ -0,0 +1,208 @@
+import os
+import sys
+import json
+import argparse
+
+import fapesp_opportunities.about as about
+
+
+def _record(op):
+    data = op.to_dict()
+    data["hits"] = list(op.hits)
+    return data
+
+
+def _print_table(opportunities, out):
+    rows = [(str(op.id), op.end_date or "-", op.title, f"{op.city} - {op.institute}") for op in opportunities]
+    header = ("ID", "END DATE", "TITLE")
+    widths = [max([len(header[k])] + [len(r[k]) for r in rows]) for k in range(2)]
+    out.write(f"{header[0]:<{widths[0]}}  {header[1]:<{widths[1]}}  {header[2]}\n")
+    for r in rows:
+        out.write(f"{r[0]:<{widths[0]}}  {r[1]:<{widths[1]}}  {r[2]}\n")
+        out.write(f"{'':<{widths[0]}}  {'':<{widths[1]}}  {r[3]}\n")
+    out.write(f"\n{len(rows)} opportunities\n")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog=about.__program_name__,
+                                     description=about.__description__)
+    parser.add_argument("--headless", action="store_true",
+                        help="search without opening the window and print the results")
+    parser.add_argument("--format", choices=["json", "jsonl", "table"], default=None,
+                        help="(headless) output format (default: table)")
+    parser.add_argument("--offline", action="store_true",
+                        help="(headless) only query the local store, without downloading the listing")
+    parser.add_argument("--config", default=None,
+                        help="(headless, archive) path of the configuration file")
+    parser.add_argument("--timings", action="store_true",
+                        help="(headless) print how long each stage of the search took")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="(GUI) print how long each startup phase takes")
+    parser.add_argument("--autostart", action="store_true",
+                        help="(GUI) install the desktop entry that starts the program at login, and exit")
+    parser.add_argument("--applications", action="store_true",
+                        help="(GUI) install the desktop entry in the applications menu, and exit")
+    parser.add_argument("--archive", action="store_true",
+                        help="walk every listing page and store all opportunities, open and closed, "
+                             "in archive.sqlite3 next to the configuration; an interrupted run resumes")
+    parser.add_argument("--archive-restart", action="store_true",
+                        help="(archive) read again the pages written by earlier runs")
+    parser.add_argument("--archive-max-pages", type=int, default=None,
+                        help="(archive) maximum number of pages per listing")
+    return parser
+
+
+# Opções que só valem em um modo, e os modos em que valem
+_MODE_OPTIONS = {
+    "format": ("headless",),
+    "offline": ("headless",),
+    "timings": ("headless",),
+    "config": ("headless", "archive"),
+    "archive_restart": ("archive",),
+    "archive_max_pages": ("archive",),
+    "profile_startup": ("gui",),
+    "autostart": ("gui",),
+    "applications": ("gui",),
+}
+
+
+def parse_args(argv):
+    """
+    Parses the command line and rejects options that do not apply to the chosen mode.
+
+    Returns:
+        argparse.Namespace: The options, with args.mode set to "headless", "archive" or "gui".
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.headless and args.archive:
+        parser.error("--headless and --archive cannot be used together")
+    args.mode = "headless" if args.headless else "archive" if args.archive else "gui"
+    for name, modes in _MODE_OPTIONS.items():
+        if getattr(args, name) not in (None, False) and args.mode not in modes:
+            option = "--" + name.replace("_", "-")
+            required = " or ".join("--" + m for m in modes if m != "gui")
+            parser.error(f"{option} requires {required}" if required else
+                         f"{option} cannot be used with --{args.mode}")
+    if args.format is None:
+        args.format = "table"
+    return args
+
+
+def run_archive(args, err=sys.stderr):
+    """
+    Runs the archive crawl of the configured listings.
+
+    Returns:
+        int: 0 if every page was stored, 1 otherwise (run again to resume).
+    """
+    import fapesp_opportunities.modules.pipeline as pipeline
+    import fapesp_opportunities.modules.network as network
+    import fapesp_opportunities.modules.archive as archive
+
+    config_path = args.config or pipeline.CONFIG_PATH
+    conf = pipeline.get_context(config_path).config.snapshot()
+    network.set_fetch_policy(pipeline.fetch_policy(conf))
+    store = archive.ArchiveStore(os.path.join(os.path.dirname(config_path), "archive.sqlite3"))
+
+    def progress(done, total, url):
+        err.write(f"\r{done}/{total} pages")
+        err.flush()
+
+    try:
+        result = archive.crawl_archive(pipeline.source_urls(conf), store,
+                                       max_workers=conf["crawl-workers"],
+                                       max_pages=args.archive_max_pages,
+                                       restart=args.archive_restart,
+                                       progress=progress)
+    except KeyboardInterrupt:
+        err.write(f"\n{about.__program_name__}: interrupted; run --archive again to resume\n")
+        return 1
+    finally:
+        counts = store.counts()
+        store.close()
+
+    err.write(f"\n{result.pages} pages and {result.items} items written, {result.skipped} pages already archived.\n")
+    err.write("Archive: " + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())) + "\n")
+    for url, error in result.failed.items():
+        err.write(f"{about.__program_name__}: warning: {url}: {error}\n")
+    return 1 if result.failed else 0
+
+
+def run_headless(args, out=sys.stdout):
+    """
+    Runs the same pipeline as the GUI and prints the results.
+
+    Returns:
+        int: 0 on success, 1 on error.
+    """
+    # Só módulos sem Qt são carregados aqui
+    import fapesp_opportunities.modules.pipeline as pipeline
+    import fapesp_opportunities.modules.timing as timing
+
+    config_path = args.config or pipeline.CONFIG_PATH
+    timings = timing.SearchTimings()
+    try:
+        opportunities = pipeline.buscar_oportunidades(config_path, online=not args.offline, timings=timings)
+    except Exception as e:
+        sys.stderr.write(f"{about.__program_name__}: error: {e}\n")
+        return 1
+    timing.log_timings(timings, results=len(opportunities), online=not args.offline)
+
+    query_error = pipeline.get_context(config_path).config.query_error
+    if query_error:
+        sys.stderr.write(f"{about.__program_name__}: error: invalid query, using the keyword lists: {query_error}\n")
+
+    # Fontes que falharam não impedem o resultado das outras
+    for status in pipeline.get_context(config_path).sources:
+        if not status.ok:
+            sys.stderr.write(f"{about.__program_name__}: warning: {status.url}: {status.error}\n")
+        for url, error in status.failed_pages.items():
+            sys.stderr.write(f"{about.__program_name__}: warning: {url}: {error}\n")
+    for url, error in pipeline.get_context(config_path).detail_failures.items():
+        sys.stderr.write(f"{about.__program_name__}: warning: details of {url}: {error}\n")
+    stale = pipeline.get_context(config_path).stale
+    if stale and not args.offline:
+        sys.stderr.write(f"{about.__program_name__}: warning: stale results: {stale}\n")
+
+    if args.format == "json":
+        json.dump([_record(op) for op in opportunities], out, indent=2, ensure_ascii=False)
+        out.write("\n")
+    elif args.format == "jsonl":
+        for op in opportunities:
+            out.write(json.dumps(_record(op), ensure_ascii=False) + "\n")
+    else:
+        _print_table(opportunities, out)
+
+    if args.timings:
+        sys.stderr.write(timings.details() + "\n")
+    # Resultados das listas de palavras, mas a consulta configurada precisa de conserto
+    return 1 if query_error else 0
+
+
+def main(argv=None):
+    """
+    Entry point of the fapesp-opportunities command.
+
+    With --headless the search runs in the terminal, and with --archive the
+    archive crawl runs; PyQt5 is never imported in these modes. Otherwise the
+    graphical program is started.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    args = parse_args(argv)
+
+    if args.mode == "gui":
+        from fapesp_opportunities.modules.startup import StartupProfiler
+
+        profiler = StartupProfiler(enabled=args.profile_startup)
+        with profiler.phase("import PyQt5"):
+            import PyQt5.QtWidgets
+        with profiler.phase("import program"):
+            from fapesp_opportunities.program import main as gui_main
+        return gui_main(profiler=profiler)
+
+    sys.exit(run_archive(args) if args.mode == "archive" else run_headless(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,26 @@ def update_desktop_database(desktop_path):
     except FileNotFoundError:
         print("The command 'update-desktop-database' was not found. Verify that the package 'desktop-file-utils' is installed.")
 
+def write_if_changed(path, content, overwrite=False, mode=None):
+    """
+    Writes a file only when it is missing, or when overwrite is True and its content differs.
+
+    Returns:
+        bool: True if the file was written.
+    """
+    if os.path.exists(path):
+        if not overwrite:
+            return False
+        with open(path, "r") as f:
+            if f.read() == content:
+                return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+    if mode is not None:
+        os.chmod(path, mode)
+    return True
+
 def create_desktop_file(desktop_path, overwrite=False):
     base_dir_path = os.path.dirname(os.path.abspath(__file__))
     icon_path = os.path.join(base_dir_path, 'icons', 'logo.png')
@@ -38,11 +58,8 @@ StartupWMClass={about.__package__}
 """
     path = os.path.expanduser(os.path.join(desktop_path,f"{about.__program_name__}.desktop"))
     
-    if not os.path.exists(path) or overwrite == True: 
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w") as f:
-            f.write(desktop_entry)
-        os.chmod(path, 0o755)
+    # Arquivo já atualizado: nada a fazer, nem update-desktop-database
+    if write_if_changed(path, desktop_entry, overwrite, 0o755):
         print(f"File {about.__program_name__}.desktop created in {path}.")
         update_desktop_database(desktop_path)
     
@@ -63,11 +80,7 @@ Icon={icon}
     path = os.path.join("~",".local","share","desktop-directories",f"{directory_name}.directory")
     path = os.path.expanduser(path)
     
-    if not os.path.exists(path) or overwrite == True:  # Evita sobrescrever
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w") as f:
-            f.write(desktop_entry)
-        os.chmod(path, 0o755)
+    if write_if_changed(path, desktop_entry, overwrite, 0o755):  # Evita sobrescrever
         print(f"File {path} created.")
     
 def create_desktop_menu(directory_name = "ResearchTools",
@@ -89,10 +102,7 @@ def create_desktop_menu(directory_name = "ResearchTools",
     path = os.path.join("~",".config","menus","applications-merged",f"{basename}.menu")
     path = os.path.expanduser(path)
     
-    if not os.path.exists(path) or overwrite == True:  # Evita sobrescrever
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w") as f:
-            f.write(desktop_entry)
+    if write_if_changed(path, desktop_entry, overwrite):  # Evita sobrescrever
         print(f"File {path} created.")
 
 if __name__ == '__main__':
@@ -0,0 +1,259 @@
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from fapesp_opportunities.modules.fapesp import Opportunity, extract_listed_opportunities, find_page_urls
+from fapesp_opportunities.modules.network import fetch
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archive (
+    id           INTEGER PRIMARY KEY,
+    status       TEXT NOT NULL,
+    title        TEXT NOT NULL,
+    body         TEXT NOT NULL,
+    text         TEXT NOT NULL,
+    link         TEXT NOT NULL,
+    city         TEXT NOT NULL,
+    institute    TEXT NOT NULL,
+    end_date     TEXT NOT NULL,
+    deadline     INTEGER NOT NULL,
+    page         TEXT NOT NULL,
+    first_seen   REAL NOT NULL,
+    last_seen    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_archive_status_deadline
+    ON archive (status, deadline);
+CREATE TABLE IF NOT EXISTS archive_pages (
+    url          TEXT PRIMARY KEY,
+    items        INTEGER NOT NULL,
+    crawled      REAL NOT NULL
+);
+"""
+
+_COLUMNS = "title, body, text, link, id, city, institute, end_date, deadline"
+
+
+class ArchiveStore:
+    """
+    SQLite archive of every listed opportunity, open or closed, keyed by id.
+
+    Each listing page is written in its own transaction together with its
+    checkpoint row, so after an interruption the pages already written are
+    known and the crawl resumes from the others.
+
+    Parameters:
+        path (str): Path of the SQLite file.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def write_page(self, url, items, now=None):
+        """
+        Stores the items of one listing page and marks the page as crawled.
+
+        Parameters:
+            url (str): The listing page.
+            items (list): (status, Opportunity) tuples.
+            now (float): Timestamp of the crawl. Default is time.time().
+        """
+        now = now if now is not None else time.time()
+        rows = [(op.id, status, op.title, op.body, op.text, op.link, op.city, op.institute,
+                 op.end_date, op.deadline, url, now, now) for status, op in items]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO archive (id, status, title, body, text, link, city, institute, "
+                    "end_date, deadline, page, first_seen, last_seen) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET status = excluded.status, title = excluded.title, "
+                    "body = excluded.body, text = excluded.text, link = excluded.link, city = excluded.city, "
+                    "institute = excluded.institute, end_date = excluded.end_date, "
+                    "deadline = excluded.deadline, page = excluded.page, last_seen = excluded.last_seen",
+                    rows)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO archive_pages (url, items, crawled) VALUES (?, ?, ?)",
+                    (url, len(rows), now))
+
+    def crawled_pages(self):
+        """
+        Returns the set of listing pages already written.
+        """
+        with self._lock:
+            return {r[0] for r in self._conn.execute("SELECT url FROM archive_pages")}
+
+    def reset_pages(self):
+        """
+        Forgets the checkpoints, so the next crawl reads every page again; the records are kept.
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM archive_pages")
+
+    def counts(self):
+        """
+        Returns a dict {status: number of opportunities}.
+        """
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM archive GROUP BY status"))
+
+    def iter_records(self, status=None, batch_size=500):
+        """
+        Yields (status, Opportunity) tuples ordered by id, reading batch_size rows at a time.
+
+        Parameters:
+            status (str): Only this status ("open", "closed", ...); None for all.
+            batch_size (int): Rows fetched from SQLite per step.
+        """
+        sql = f"SELECT status, {_COLUMNS} FROM archive WHERE id > ?"
+        params = []
+        if status is not None:
+            sql += " AND status = ?"
+            params.append(status)
+        sql += " ORDER BY id LIMIT ?"
+
+        last = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(sql, [last] + params + [batch_size]).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row[0], Opportunity.load(row[1:])
+            last = rows[-1][5]
+
+
+class ArchiveResult:
+    """
+    Summary of crawl_archive().
+
+    Attributes:
+        pages (int): Listing pages written in this run.
+        skipped (int): Pages skipped because an earlier run already wrote them.
+        items (int): Items written in this run, open and closed.
+        failed (dict): {page url: error message} of the pages that could not be read;
+                       they are retried by the next run.
+        cancelled (bool): True if the crawl stopped before the end.
+    """
+    def __init__(self):
+        self.pages = 0
+        self.skipped = 0
+        self.items = 0
+        self.failed = {}
+        self.cancelled = False
+
+    def __repr__(self):
+        return (f"ArchiveResult(pages={self.pages}, skipped={self.skipped}, items={self.items}, "
+                f"failed={len(self.failed)}, cancelled={self.cancelled})")
+
+
+def _read_page(url, base_url):
+    html = fetch(url).text
+    return extract_listed_opportunities(html, base_url), html
+
+
+def crawl_archive(start_urls, archive, base_url="https://fapesp.br", max_workers=4, max_pages=None,
+                  restart=False, progress=None, is_cancelled=None):
+    """
+    Walks every page of the listings and stores all their items, open and closed.
+
+    The first page of each listing is always read again (it reveals how many
+    pages there are now); the other pages are skipped when a previous,
+    interrupted run already wrote them, unless restart is True. A run that
+    reads every page without failures clears the checkpoints, so the next run
+    reads all pages again and archives items that moved to other pages.
+    Pages are downloaded by a
+    thread pool through network.fetch(), so the token bucket, retries and
+    circuit breaker of the FetchPolicy keep the crawl polite. At most
+    2 * max_workers pages are in memory at once; each is written to the
+    archive as soon as it arrives.
+
+    Parameters:
+        start_urls (list): First page of each listing.
+        archive (ArchiveStore): Where the items and checkpoints are written.
+        base_url (str): The base URL to complete relative links.
+        max_workers (int): Pages downloaded at the same time.
+        max_pages (int): Optional limit of pages per listing, including the first.
+        restart (bool): If True, pages written by earlier runs are read again.
+        progress (callable): Optional progress(done, total, url) called after each page.
+        is_cancelled (callable): Optional function; when it returns True no new
+                                 page is requested and the crawl returns.
+
+    Returns:
+        ArchiveResult: What was written, skipped and failed.
+    """
+    if restart:
+        archive.reset_pages()
+    done = archive.crawled_pages()
+    result = ArchiveResult()
+
+    pending = []
+    for url in dict.fromkeys(start_urls):
+        try:
+            items, html = _read_page(url, base_url)
+        except Exception as e:
+            result.failed[url] = str(e) or type(e).__name__
+            continue
+        archive.write_page(url, items)
+        result.pages += 1
+        result.items += len(items)
+
+        page_urls = find_page_urls(html, url)
+        if max_pages is not None:
+            page_urls = page_urls[:max(0, max_pages - 1)]
+        for page_url in page_urls:
+            if page_url in done:
+                result.skipped += 1
+            else:
+                pending.append(page_url)
+
+    total = len(pending)
+    if progress is not None:
+        progress(0, total, None)
+
+    # Janela deslizante: só algumas páginas baixadas ficam na memória
+    queue = iter(pending)
+    finished = 0
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        running = {}
+
+        def submit():
+            while len(running) < 2 * max(1, max_workers):
+                if is_cancelled is not None and is_cancelled():
+                    result.cancelled = True
+                    return
+                page_url = next(queue, None)
+                if page_url is None:
+                    return
+                running[executor.submit(_read_page, page_url, base_url)] = page_url
+
+        submit()
+        while running:
+            completed, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in completed:
+                page_url = running.pop(future)
+                try:
+                    items, _ = future.result()
+                except Exception as e:
+                    result.failed[page_url] = str(e) or type(e).__name__
+                else:
+                    archive.write_page(page_url, items)
+                    result.pages += 1
+                    result.items += len(items)
+                finished += 1
+                if progress is not None:
+                    progress(finished, total, page_url)
+            submit()
+
+    # Retomar só vale para execuções interrompidas
+    if not result.cancelled and not result.failed:
+        archive.reset_pages()
+    return result
@@ -0,0 +1,231 @@
+import html
+from collections import OrderedDict
+from difflib import SequenceMatcher
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QPoint, QSize, QEvent, QUrl, pyqtSignal
+from PyQt5.QtGui import QColor, QPen, QPainter, QTextDocument, QDesktopServices, QFont
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem, QStyle, QListView, QAbstractItemView
+
+
+OpportunityRole = Qt.UserRole + 1
+
+
+class OpportunityModel(QAbstractListModel):
+    """
+    List model of Opportunity records.
+
+    set_opportunities() compares the new list with the current one by id and
+    emits only the row insertions, removals and changes needed, so the view
+    keeps its scroll position and does not rebuild the rows that stayed.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._items = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._items)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._items):
+            return None
+        op = self._items[index.row()]
+        if role == OpportunityRole:
+            return op
+        if role == Qt.DisplayRole:
+            return op.title
+        if role == Qt.ToolTipRole:
+            return op.link
+        return None
+
+    def opportunities(self):
+        return list(self._items)
+
+    def opportunity(self, row):
+        return self._items[row]
+
+    def set_opportunities(self, opportunities):
+        """
+        Replaces the content of the model applying only the differences by id.
+        """
+        opportunities = list(opportunities)
+        old_ids = [op.id for op in self._items]
+        new_ids = [op.id for op in opportunities]
+        opcodes = SequenceMatcher(None, old_ids, new_ids, autojunk=False).get_opcodes()
+
+        # Aplica de trás para frente para manter os índices válidos
+        for tag, i1, i2, j1, j2 in reversed(opcodes):
+            if tag in ("delete", "replace"):
+                self.beginRemoveRows(QModelIndex(), i1, i2 - 1)
+                del self._items[i1:i2]
+                self.endRemoveRows()
+            if tag in ("insert", "replace"):
+                self.beginInsertRows(QModelIndex(), i1, i1 + (j2 - j1) - 1)
+                self._items[i1:i1] = opportunities[j1:j2]
+                self.endInsertRows()
+            if tag == "equal":
+                for offset in range(i2 - i1):
+                    row = i1 + offset
+                    new = opportunities[j1 + offset]
+                    if not (self._items[row] == new and self._items[row].hits == new.hits):
+                        self._items[row] = new
+                        idx = self.index(row)
+                        self.dataChanged.emit(idx, idx)
+                    else:
+                        self._items[row] = new
+
+    def remove_ids(self, ids):
+        """
+        Removes the rows whose opportunity id is in ids.
+
+        Returns:
+            list: The removed records.
+        """
+        ids = set(ids)
+        removed = []
+        for row in reversed(range(len(self._items))):
+            if self._items[row].id in ids:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                removed.append(self._items.pop(row))
+                self.endRemoveRows()
+        removed.reverse()
+        return removed
+
+
+class CardDelegate(QStyledItemDelegate):
+    """
+    Paints each opportunity as a card with a QTextDocument.
+
+    Nothing is created for rows that are not visible: documents are built on
+    demand for painting, size hints and link hit-testing, and kept in a small
+    LRU cache. Clicks on the "⋮" corner emit menu_requested; clicks on links
+    open them in the browser.
+    """
+    menu_requested = pyqtSignal(object, QPoint)
+
+    MARGIN = 3
+    PADDING = 6
+    MENU_SIZE = 20
+    CACHE_SIZE = 256
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._docs = OrderedDict()
+        self._font = QFont()
+        self._font.setPointSize(11)
+
+    def clear_cache(self):
+        self._docs.clear()
+
+    ############################################################################
+    def _html(self, op, row, count):
+        esc = html.escape
+        text = (f"<b>{row + 1}/{count} - {esc(op.title)} - {op.id}</b>"
+                f"<div style='color:#333333'>{esc(op.body)} <a href=\"{esc(op.link)}\">link</a></div>"
+                f"<div style='color:#333333'><i>{esc(op.city)} - {esc(op.institute)}</i></div>"
+                f"<div style='color:#333333'><i>End date: {esc(op.end_date)}</i></div>")
+        if op.hits:
+            text += f"<div style='color:#555555'><i>Matched: {esc(', '.join(op.hits))}</i></div>"
+        return text
+
+    def _document(self, op, row, count, width):
+        key = (op.id, op.hits, row, count, width)
+        doc = self._docs.get(key)
+        if doc is not None:
+            self._docs.move_to_end(key)
+            return doc
+        doc = QTextDocument()
+        doc.setDefaultFont(self._font)
+        doc.setDocumentMargin(0)
+        doc.setHtml(self._html(op, row, count))
+        doc.setTextWidth(max(50, width))
+        self._docs[key] = doc
+        if len(self._docs) > self.CACHE_SIZE:
+            self._docs.popitem(last=False)
+        return doc
+
+    def _geometry(self, option_rect):
+        card = option_rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        text_rect = card.adjusted(self.PADDING, self.PADDING, -self.PADDING - self.MENU_SIZE, -self.PADDING)
+        menu_rect = QRect(card.right() - self.PADDING - self.MENU_SIZE, card.top() + self.PADDING,
+                          self.MENU_SIZE, self.MENU_SIZE)
+        return card, text_rect, menu_rect
+
+    def _doc_for(self, option, index):
+        op = index.data(OpportunityRole)
+        _, text_rect, _ = self._geometry(option.rect)
+        return op, text_rect, self._document(op, index.row(), index.model().rowCount(), text_rect.width())
+
+    ############################################################################
+    def paint(self, painter, option, index):
+        op, text_rect, doc = self._doc_for(option, index)
+        card, _, menu_rect = self._geometry(option.rect)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        border = "#bbbbbb" if option.state & QStyle.State_MouseOver else "#dddddd"
+        painter.setPen(QPen(QColor(border), 3))
+        painter.setBrush(QColor("#f3f3f3"))
+        painter.drawRoundedRect(card, 10, 10)
+
+        painter.setPen(QColor("#000000"))
+        painter.drawText(menu_rect, Qt.AlignCenter, "⋮")
+
+        painter.translate(text_rect.topLeft())
+        doc.drawContents(painter)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        option = QStyleOptionViewItem(option)
+        width = option.rect.width()
+        if width <= 0 and option.widget is not None:
+            width = option.widget.viewport().width()
+        option.rect = QRect(0, 0, width, 0)
+        _, _, doc = self._doc_for(option, index)
+        height = int(doc.size().height()) + 2 * (self.MARGIN + self.PADDING)
+        return QSize(width, max(height, self.MENU_SIZE + 2 * (self.MARGIN + self.PADDING)))
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.MouseMove, QEvent.MouseButtonRelease):
+            return False
+
+        op, text_rect, doc = self._doc_for(option, index)
+        _, _, menu_rect = self._geometry(option.rect)
+        pos = event.pos()
+        anchor = ""
+        if text_rect.contains(pos):
+            anchor = doc.documentLayout().anchorAt(pos - text_rect.topLeft())
+
+        widget = option.widget
+        if event.type() == QEvent.MouseMove:
+            if widget is not None:
+                over = bool(anchor) or menu_rect.contains(pos)
+                widget.viewport().setCursor(Qt.PointingHandCursor if over else Qt.ArrowCursor)
+            return False
+
+        if event.button() != Qt.LeftButton:
+            return False
+        if menu_rect.contains(pos):
+            global_pos = widget.viewport().mapToGlobal(menu_rect.bottomLeft()) if widget is not None else QPoint()
+            self.menu_requested.emit(op, global_pos)
+            return True
+        if anchor:
+            QDesktopServices.openUrl(QUrl(anchor))
+            return True
+        return False
+
+
+class CardListView(QListView):
+    """
+    QListView configured for variable height cards painted by CardDelegate.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMouseTracking(True)
+        self.setResizeMode(QListView.Adjust)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(50)
+        self.setUniformItemSizes(False)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setStyleSheet("QListView { background-color: #FFFFFF; border: none; }")
+        self.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -1,5 +1,9 @@
 import os
 import json
+import atexit
+import threading
+
+from fapesp_opportunities.modules.query import compile_query, query_from_keywords, QuerySyntaxError
 
 DEFAULT_CONTENT = {
     "url": "https://fapesp.br/oportunidades/mais-recentes/",
@@ -16,7 +20,32 @@ DEFAULT_CONTENT = {
                         "Bolsas de PD" ],
     "title-contents-filters": ["neurais","visão", "medicina", "computação", "remoto"],
     "body-contents": ["neurais","visão","computação", "elétrica", "neural",  "sinais", "machine learning"],
-    "avoid_ids":[]
+    "query": "",
+    "avoid_ids":[],
+    "crawl-pages": True,
+    "crawl-max-pages": 20,
+    "crawl-workers": 4,
+    "cache-max-age": 300,
+    "cache-max-bytes": 20971520,
+    "details-fetch": False,
+    "details-workers": 4,
+    "details-rate": 2.0,
+    "details-max-age": 604800,
+    "parser": "auto",
+    "timing-log": "",
+    "profile-searches": False,
+    "refresh-interval": 1800,
+    "refresh-min-interval": 600,
+    "refresh-max-interval": 21600,
+    "notify-new": True,
+    "fetch-connect-timeout": 5,
+    "fetch-read-timeout": 20,
+    "fetch-retries": 2,
+    "fetch-max-time": 60,
+    "fetch-rate": 4,
+    "fetch-burst": 8,
+    "breaker-failures": 3,
+    "breaker-cooldown": 300
 }
 
 def verify_default_config(path):
@@ -27,6 +56,7 @@ def verify_default_config(path):
     """
 
     config_data = {}
+    corrupted = False
 
     # Se o arquivo existir, carrega o conteúdo
     if os.path.exists(path):
@@ -34,8 +64,9 @@ def verify_default_config(path):
             try:
                 config_data = json.load(f)
             except json.JSONDecodeError:
-                # Se o JSON estiver corrompido, cria um novo
+                # Se o JSON estiver corrompido, guarda uma cópia e cria um novo
                 config_data = {}
+                corrupted = True
     else:
         # Garante que os diretórios existam
         os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -47,10 +78,12 @@ def verify_default_config(path):
             config_data[key] = value
             updated = True
 
+    if corrupted:
+        os.replace(path, path + ".bak")
+
     # Se o arquivo não existia ou se alguma chave foi adicionada, salva o arquivo
     if not os.path.exists(path) or updated:
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(config_data, f, ensure_ascii=False, indent=4)
+        save_config(path, config_data)
 
 
 
@@ -62,5 +95,164 @@ def load_config(config_path):
 def save_config(config_path,config_data):
     os.makedirs(os.path.dirname(config_path), exist_ok=True)
     
-    with open(config_path, 'w', encoding='utf-8') as f:
+    # Escrita atômica: arquivo temporário + rename
+    tmp_path = config_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         json.dump(config_data, f, ensure_ascii=False, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, config_path)
+
+
+class ConfigService:
+    """
+    Configuration loaded once and kept in memory.
+
+    The file is read again only by reload(), when its modification time or size
+    changed (the GUI calls it from a QFileSystemWatcher). Changes made with
+    update() are written back after a short delay, atomically, and several
+    changes in a row produce a single write. Each time the content changes the
+    derived structures are rebuilt:
+
+        query      Compiled Query of "query", or of the three keyword
+                   lists when "query" is empty. If "query" is malformed
+                   it is None and query_error holds the message.
+        avoid_ids  "avoid_ids" as a set.
+
+    Functions registered with add_listener(func) are called as
+    func(service, changed) after every change, where changed is the set of
+    keys whose value changed; they may run in any thread.
+    """
+    def __init__(self, path, write_delay=1.0):
+        self.path = path
+        self.write_delay = write_delay
+        self._lock = threading.RLock()
+        self._timer = None
+        self._listeners = []
+        self._stamp = None
+        verify_default_config(path)
+        self._load()
+        atexit.register(self.flush)
+
+    ############################################################################
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _load(self):
+        data = load_config(self.path)
+        for key, value in DEFAULT_CONTENT.items():
+            data.setdefault(key, value)
+        self._data = data
+        self._stamp = self._file_stamp()
+        self._rebuild()
+
+    def _rebuild(self):
+        self.query_error = None
+        try:
+            if self._data["query"].strip():
+                self.query = compile_query(self._data["query"])
+            else:
+                self.query = query_from_keywords(self._data["title-contents"],
+                                                 self._data["title-contents-filters"],
+                                                 self._data["body-contents"])
+        except QuerySyntaxError as e:
+            self.query = None
+            self.query_error = str(e)
+        self.avoid_ids = set(self._data["avoid_ids"])
+
+    def _notify(self, changed):
+        for func in list(self._listeners):
+            func(self, changed)
+
+    ############################################################################
+    def add_listener(self, func):
+        """
+        Registers func(service, changed) to be called after every change.
+        """
+        self._listeners.append(func)
+
+    def __getitem__(self, key):
+        with self._lock:
+            return self._data[key]
+
+    def snapshot(self):
+        """
+        Returns a shallow copy of the configuration.
+        """
+        with self._lock:
+            return dict(self._data)
+
+    def reload(self):
+        """
+        Reads the file again if it changed since the last read or write.
+
+        Returns:
+            bool: True if the configuration changed.
+        """
+        with self._lock:
+            stamp = self._file_stamp()
+            if stamp is None or stamp == self._stamp:
+                return False
+            old = self._data
+            try:
+                self._load()
+            except (OSError, json.JSONDecodeError):
+                # Arquivo sendo editado ou inválido; mantém a versão em memória
+                return False
+            changed = {key for key in self._data.keys() | old.keys() if self._data.get(key) != old.get(key)}
+        if not changed:
+            return False
+        self._notify(changed)
+        return True
+
+    def update(self, **changes):
+        """
+        Changes keys of the configuration and schedules a debounced write.
+
+        Keys with "-" can be given with "_", e.g. update(body_contents=[...]);
+        "avoid_ids" keeps its name.
+        """
+        with self._lock:
+            changed = set()
+            for key, value in changes.items():
+                if key not in self._data:
+                    key = key.replace("_", "-")
+                self._data[key] = value
+                changed.add(key)
+            self._rebuild()
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.write_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+        self._notify(changed)
+
+    def flush(self):
+        """
+        Writes pending changes to disk immediately.
+        """
+        with self._lock:
+            if self._timer is None:
+                return
+            self._timer.cancel()
+            self._timer = None
+            save_config(self.path, self._data)
+            self._stamp = self._file_stamp()
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_service(config_path):
+    """
+    Returns the shared ConfigService of a configuration file.
+    """
+    with _services_lock:
+        if config_path not in _services:
+            _services[config_path] = ConfigService(config_path)
+        return _services[config_path]
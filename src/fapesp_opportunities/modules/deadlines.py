@@ -0,0 +1,116 @@
+from bisect import bisect_left, insort
+from datetime import date
+
+
+def _today(today):
+    return today if today is not None else date.today().toordinal()
+
+
+class DeadlineIndex:
+    """
+    Opportunity records kept in deadline order.
+
+    The records are indexed by the (deadline, id) pairs in a sorted list, so
+    insert() and discard() cost one binary search, and range queries such as
+    "closing in the next 7 days" cost one binary search per bound plus the
+    records returned. Nothing is sorted again when the results change.
+
+    Queries first drop the records whose deadline is already past, so expired
+    opportunities leave the index by themselves.
+
+    Parameters:
+        records (iterable): Initial Opportunity records.
+    """
+    def __init__(self, records=()):
+        self._keys = []
+        self._records = {}
+        for op in records:
+            self.insert(op)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, id_number):
+        return id_number in self._records
+
+    def __iter__(self):
+        return (self._records[id_number] for _, id_number in self._keys)
+
+    def insert(self, op):
+        """
+        Adds a record, or replaces the record with the same id.
+        """
+        old = self._records.get(op.id)
+        if old is not None and old.deadline != op.deadline:
+            del self._keys[bisect_left(self._keys, (old.deadline, op.id))]
+            old = None
+        self._records[op.id] = op
+        if old is None:
+            insort(self._keys, (op.deadline, op.id))
+
+    def discard(self, id_number):
+        """
+        Removes the record with this id, if present.
+
+        Returns:
+            Opportunity: The removed record, or None.
+        """
+        op = self._records.pop(id_number, None)
+        if op is not None:
+            del self._keys[bisect_left(self._keys, (op.deadline, id_number))]
+        return op
+
+    def sync(self, records):
+        """
+        Makes the index hold exactly these records, touching only the ones that changed.
+        """
+        records = {op.id: op for op in records}
+        for id_number in [i for i in self._records if i not in records]:
+            self.discard(id_number)
+        for op in records.values():
+            self.insert(op)
+
+    def prune(self, today=None):
+        """
+        Removes the records whose deadline is before today.
+
+        Returns:
+            list: The removed records, in deadline order.
+        """
+        end = bisect_left(self._keys, (_today(today),))
+        if not end:
+            return []
+        expired = [self._records.pop(id_number) for _, id_number in self._keys[:end]]
+        del self._keys[:end]
+        return expired
+
+    def range(self, start=None, end=None, today=None):
+        """
+        Returns the open records with start <= deadline <= end, in deadline order.
+
+        Parameters:
+            start (int): First deadline ordinal; None for no lower bound.
+            end (int): Last deadline ordinal; None for no upper bound.
+            today (int): Date ordinal of today. Default is date.today().
+
+        Returns:
+            list: Opportunity records.
+        """
+        self.prune(today)
+        lo = 0 if start is None else bisect_left(self._keys, (start,))
+        hi = len(self._keys) if end is None else bisect_left(self._keys, (end + 1,))
+        return [self._records[id_number] for _, id_number in self._keys[lo:hi]]
+
+    def closing_within(self, days, today=None):
+        """
+        Returns the records whose deadline is between today and today + days.
+        """
+        today = _today(today)
+        return self.range(today, today + days, today)
+
+    def nearest(self, today=None):
+        """
+        Returns the open record with the nearest deadline, or None.
+        """
+        self.prune(today)
+        return self._records[self._keys[0][1]] if self._keys else None
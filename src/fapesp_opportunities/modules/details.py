@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from fapesp_opportunities.modules.network import fetch
+import fapesp_opportunities.about as about
+
+logger = logging.getLogger(about.__package__ + ".details")
+
+
+class HostRateLimiter:
+    """
+    Spaces the requests sent to each host by at least 1/rate seconds.
+
+    Parameters:
+        rate (float): Maximum requests per second to a host; 0 disables the limit.
+    """
+    def __init__(self, rate=2.0):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = {}
+
+    def wait(self, url):
+        if self.interval <= 0:
+            return
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class DetailCache:
+    """
+    On-disk cache of the text of announcement pages, one JSON file per opportunity id.
+
+    Parameters:
+        directory (str): Directory of the cache files.
+        max_age (float): Seconds after which a cached page is fetched again.
+    """
+    def __init__(self, directory, max_age=7 * 24 * 3600):
+        self.directory = directory
+        self.max_age = max_age
+
+    def _path(self, id_number):
+        return os.path.join(self.directory, f"{id_number}.json")
+
+    def get(self, id_number):
+        """
+        Returns the cached text of an id, or None if missing or too old.
+        """
+        try:
+            with open(self._path(id_number), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if time.time() - entry.get("fetched", 0) > self.max_age:
+            return None
+        return entry.get("text")
+
+    def put(self, id_number, text):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(id_number)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"fetched": time.time(), "text": text}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+def extract_detail_text(html):
+    """
+    Extracts the visible text of the main content of an announcement page.
+
+    Parameters:
+        html (str): HTML of the announcement page.
+
+    Returns:
+        str: The text, with scripts, styles, header, navigation and footer removed.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(["script", "style", "noscript", "header", "nav", "footer"]):
+        tag.decompose()
+    main = soup.find("article") or soup.find("main") or soup.find(class_="content") or soup.body or soup
+    text = main.get_text(" ", strip=True)
+    soup.decompose()
+    return text
+
+
+def fetch_details(opportunities, cache=None, max_workers=4, rate=2.0, limiter=None, failed=None):
+    """
+    Downloads the announcement page of each opportunity and appends its text to the record.
+
+    Pages already in the cache are not downloaded. The others are fetched by a
+    bounded thread pool, respecting a per-host rate limit.
+
+    Parameters:
+        opportunities (list): Opportunity records; they are changed in place.
+        cache (DetailCache): Optional on-disk cache of the page texts.
+        max_workers (int): Maximum number of concurrent downloads.
+        rate (float): Maximum requests per second to each host.
+        limiter (HostRateLimiter): Limiter to use instead of a new one built from rate.
+        failed (dict): Optional dict that receives {page url: error message} of the
+                       announcement pages that could not be downloaded.
+
+    Returns:
+        list: The same records, whose text now includes the announcement text.
+              Records whose page could not be downloaded keep the listing text.
+    """
+    limiter = limiter or HostRateLimiter(rate)
+
+    texts = {}
+    missing = []
+    for op in opportunities:
+        text = cache.get(op.id) if cache is not None else None
+        if text is None:
+            missing.append(op)
+        else:
+            texts[op.id] = text
+
+    def download(op):
+        limiter.wait(op.link)
+        try:
+            text = extract_detail_text(fetch(op.link).text)
+        except Exception as e:
+            logger.info("Error downloading %s: %s", op.link, e)
+            if failed is not None:
+                failed[op.link] = str(e) or type(e).__name__
+            return op.id, None
+        if cache is not None:
+            cache.put(op.id, text)
+        return op.id, text
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as executor:
+            for id_number, text in executor.map(download, missing):
+                if text is not None:
+                    texts[id_number] = text
+
+    for op in opportunities:
+        if op.id in texts:
+            op.add_detail(texts[op.id])
+    return opportunities
@@ -1,25 +1,158 @@
-import requests
-from bs4 import BeautifulSoup
+import os
 import re
+import time
+import threading
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from bisect import bisect_right
+from datetime import datetime, date
+from operator import attrgetter
+from urllib.parse import urljoin
 
-def get_open_opportunities(url = "https://fapesp.br/oportunidades/mais-recentes/"):
+from fapesp_opportunities.modules.matcher import normalize_text, compile_matcher, KeywordMatcher
+from fapesp_opportunities.modules.network import fetch, fetch_stream
+from fapesp_opportunities.modules.parsememo import ParseMemo, content_digest
+
+NO_DEADLINE = date.max.toordinal()
+
+
+def _parse_html(markup):
+    # bs4 só é importado no primeiro uso, para não pesar na inicialização
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(markup, 'html.parser')
+
+
+# Versão do formato de Opportunity.dump; muda quando o parser muda
+RECORD_VERSION = 1
+
+class Opportunity:
     """
-    Retrieves the HTML of currently open opportunities from the FAPESP website.
+    Compact record of a single parsed opportunity.
+
+    Every field is extracted once, at parse time, so the filters, the sort and
+    the GUI never have to touch the HTML again.
+
+    Attributes:
+        title (str): The opportunity title.
+        body (str): The summary or description.
+        text (str): Full visible text of the <li> block (used by the body filter).
+        link (str): Full URL to the opportunity.
+        id (int): Numeric id taken from the last segment of the link.
+        city (str): City of the host institution.
+        institute (str): Host institution.
+        end_date (str): Application deadline in DD/MM/YYYY format, or "".
+        deadline (int): end_date as a date ordinal, or NO_DEADLINE.
+        folded_title (str): title folded by normalize_text.
+        folded_text (str): text folded by normalize_text.
+        hits (tuple): Keywords that made the record pass the filters.
+    """
+    __slots__ = ("title", "body", "text", "link", "id",
+                 "city", "institute", "end_date", "deadline",
+                 "folded_title", "folded_text", "hits")
+
+    def __init__(self, title="", body="", text="", link="", id=0,
+                 city="", institute="", end_date="", deadline=NO_DEADLINE):
+        self.title = title
+        self.body = body
+        self.text = text
+        self.link = link
+        self.id = id
+        self.city = city
+        self.institute = institute
+        self.end_date = end_date
+        self.deadline = deadline
+        self.folded_title = normalize_text(title)
+        self.folded_text = normalize_text(text)
+        self.hits = ()
+
+    def __eq__(self, other):
+        if not isinstance(other, Opportunity):
+            return NotImplemented
+        return all(getattr(self, k) == getattr(other, k) for k in self.__slots__ if k != "hits")
+
+    def add_hits(self, keywords):
+        """
+        Records the keywords that matched this opportunity, without duplicates.
+        """
+        self.hits = tuple(dict.fromkeys(self.hits + tuple(keywords)))
+
+    def __repr__(self):
+        return f"Opportunity(id={self.id!r}, title={self.title!r}, end_date={self.end_date!r})"
+
+    def add_detail(self, detail_text):
+        """
+        Appends the text of the announcement page to the full text used by the body filter.
+        """
+        if detail_text:
+            self.text = self.text + " " + detail_text
+            self.folded_text = normalize_text(self.text)
+
+    def dump(self):
+        """
+        Returns the parsed fields as a JSON serializable list (see load).
+        """
+        return [self.title, self.body, self.text, self.link, self.id,
+                self.city, self.institute, self.end_date, self.deadline]
+
+    @classmethod
+    def load(cls, values, folded=None):
+        """
+        Rebuilds a record from the list returned by dump, without parsing any HTML.
+
+        folded may be the (folded_title, folded_text) pair saved with the values,
+        which also skips the text normalization.
+        """
+        if folded is None:
+            return cls(*values)
+        op = cls.__new__(cls)
+        (op.title, op.body, op.text, op.link, op.id,
+         op.city, op.institute, op.end_date, op.deadline) = values
+        op.folded_title, op.folded_text = folded
+        op.hits = ()
+        return op
+
+    def to_dict(self):
+        """
+        Returns the record in the dictionary layout used by the configuration and JSON output.
+        """
+        return {
+            "title": self.title,
+            "body": self.body,
+            "link": self.link,
+            "id": self.id,
+            "end-date": self.end_date,
+            "city": self.city,
+            "institute": self.institute
+        }
+
+
+def deadline_ordinal(end_date):
+    """
+    Converts a DD/MM/YYYY deadline into a date ordinal.
 
     Parameters:
-        url (str): The URL to fetch opportunities from. Default is the most recent opportunities page.
+        end_date (str): Deadline string, possibly empty.
 
     Returns:
-        list: A list of HTML strings, each representing an open opportunity (<li> element).
+        int: The ordinal of the date, or NO_DEADLINE if it is empty or invalid.
     """
-    headers = {
-        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
-    }
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
+    if not end_date:
+        return NO_DEADLINE
+    try:
+        return datetime.strptime(end_date, "%d/%m/%Y").date().toordinal()
+    except ValueError:
+        return NO_DEADLINE
 
-    soup = BeautifulSoup(response.text, 'html.parser')
 
+def _download(url, cache=None):
+    return fetch(url, cache=cache)
+
+
+def _download_html(url):
+    return _download(url).text
+
+
+def _find_open_items(soup):
     ul = soup.find('ul', class_='list')
     if not ul:
         return []
@@ -28,64 +161,1007 @@ def get_open_opportunities(url = "https://fapesp.br/oportunidades/mais-recentes/
     for li in ul.find_all('li'):
         classes = li.get('class', [])
         if 'box_col' in classes and 'aberta' in classes:
-            results.append(str(li))
+            results.append(li)
+    return results
 
+
+def item_status(classes):
+    """
+    Returns the status of a listing item from the classes of its <li>:
+    "open" (aberta), "closed" (encerrada) or the unknown class itself.
+    """
+    classes = [c for c in classes if c != 'box_col']
+    if 'aberta' in classes:
+        return "open"
+    if 'encerrada' in classes:
+        return "closed"
+    return " ".join(classes) or "unknown"
+
+
+def extract_listed_opportunities(html, base_url="https://fapesp.br"):
+    """
+    Parses every item of a listing page, open or not, with its status.
+
+    Unlike extract_opportunities(), closed items are kept; it is meant for the
+    archive crawl, so it always uses the canonical parse_opportunity().
+
+    Parameters:
+        html (str): HTML of a listing page.
+        base_url (str): The base URL to complete relative links.
+
+    Returns:
+        list: (status, Opportunity) tuples in page order; see item_status().
+    """
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('ul', class_=lambda c: _has_class(c, 'list')))
+    ul = soup.find('ul', class_='list')
+    items = []
+    if ul is not None:
+        for li in ul.find_all('li'):
+            classes = li.get('class', [])
+            if 'box_col' in classes:
+                items.append((item_status(classes), parse_opportunity(li, base_url=base_url)))
+    soup.decompose()
+    return items
+
+
+def get_open_opportunities(url = "https://fapesp.br/oportunidades/mais-recentes/"):
+    """
+    Retrieves the HTML of currently open opportunities from the FAPESP website.
+
+    Parameters:
+        url (str): The URL to fetch opportunities from. Default is the most recent opportunities page.
+
+    Returns:
+        list: A list of HTML strings, each representing an open opportunity (<li> element).
+    """
+    soup = _parse_html(_download_html(url))
+    results = [str(li) for li in _find_open_items(soup)]
+    soup.decompose()
     return results
 
 
-def filter_grants_by_title(lista_li_html, contents):
+class _PaginationParser(HTMLParser):
+    # Coleta os href dos <a> dentro de elementos cuja classe lembra paginação
+    VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input",
+            "link", "meta", "param", "source", "track", "wbr"}
+    CLASS_RE = re.compile(r"pagina|pagination|paging")
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.depth = 0
+        self.hrefs = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if self.depth:
+            if tag == "a" and attrs.get("href"):
+                self.hrefs.append(attrs["href"])
+            if tag not in self.VOID:
+                self.depth += 1
+        elif tag not in self.VOID and self.CLASS_RE.search(attrs.get("class") or ""):
+            self.depth = 1
+
+    def handle_endtag(self, tag):
+        if self.depth and tag not in self.VOID:
+            self.depth -= 1
+
+
+def _page_urls_from_hrefs(hrefs, page_url):
+    # Agrupa os links pelo "molde" com o número da página trocado por {}
+    templates = {}
+    for href in hrefs:
+        href = urljoin(page_url, href)
+        numbers = list(re.finditer(r"\d+", href))
+        if not numbers:
+            continue
+        last = numbers[-1]
+        template = href[:last.start()] + "{}" + href[last.end():]
+        templates.setdefault(template, set()).add(int(last.group()))
+
+    if not templates:
+        return []
+
+    template, numbers = max(templates.items(), key=lambda kv: len(kv[1]))
+    pages = [template.format(n) for n in range(2, max(numbers) + 1)]
+    return [p for p in pages if p.rstrip("/") != page_url.rstrip("/")]
+
+
+def find_page_urls(html, page_url):
     """
-    Filters the list of opportunities by checking if their title contains any of the specified keywords.
+    Finds the URLs of the other pages of a paginated listing.
+
+    The page is scanned by the stdlib tokenizer without building a tree.
 
     Parameters:
-        lista_li_html (list): A list of <li> elements (as HTML strings).
-        contents (set or list): Set of strings to search for in the opportunity titles.
+        html (str): HTML of the first listing page.
+        page_url (str): URL of that page, used to resolve relative links.
 
     Returns:
-        list: Filtered list of <li> HTML strings matching the title criteria.
+        list: URLs of pages 2..N, in order.
     """
+    parser = _PaginationParser()
+    parser.feed(html)
+    parser.close()
+    return _page_urls_from_hrefs(parser.hrefs, page_url)
+
+
+################################################################################
+# Parser backends
+#
+# Every backend turns the HTML of a listing page into the same Opportunity
+# records as parse_opportunity(); only the first ul.list is examined.
+
+def _has_class(value, name):
+    return name in (value or "").split()
+
+
+class SoupBackend:
+    """
+    BeautifulSoup backend; only the ul.list subtree is built (SoupStrainer).
+
+    Parameters:
+        features (str): bs4 tree builder, "html.parser" (stdlib) or "lxml".
+    """
+    def __init__(self, features='html.parser'):
+        self.features = features
+        self.name = "html.parser" if features == 'html.parser' else "bs4-" + features
+
+    def available(self):
+        try:
+            from bs4 import BeautifulSoup
+            if self.features == 'lxml':
+                import lxml
+        except ImportError:
+            return False
+        return True
+
+    def parse(self, html, base_url):
+        from bs4 import BeautifulSoup, SoupStrainer
+
+        soup = BeautifulSoup(html, self.features, parse_only=SoupStrainer('ul', class_=lambda c: _has_class(c, 'list')))
+        records = [parse_opportunity(li, base_url=base_url) for li in _find_open_items(soup)]
+        soup.decompose()
+        return records
+
+
+class LxmlBackend:
+    """
+    lxml.html backend (libxml2 parser, XPath lookups).
+    """
+    name = "lxml"
+
+    def available(self):
+        try:
+            import lxml.html
+        except ImportError:
+            return False
+        return True
+
+    @staticmethod
+    def _strings(el):
+        return [t.strip() for t in el.itertext() if t.strip()]
+
+    def _labeled(self, li, label):
+        for strong in li.iter('strong'):
+            if len(strong) == 0 and strong.text and label in strong.text:
+                return strong.tail.strip() if strong.tail else ""
+        return ""
+
+    def parse(self, html, base_url):
+        import lxml.html
+        from lxml.etree import ParserError
+
+        try:
+            root = lxml.html.document_fromstring(html)
+        except ParserError:
+            return []
+        uls = root.xpath("(//ul[contains(concat(' ', normalize-space(@class), ' '), ' list ')])[1]")
+        if not uls:
+            return []
+
+        records = []
+        for li in uls[0].iter('li'):
+            classes = li.get('class')
+            if not (_has_class(classes, 'box_col') and _has_class(classes, 'aberta')):
+                continue
+            title_tag = next((e for e in li.iter('strong') if _has_class(e.get('class'), 'title')), None)
+            summary_tag = next((e for e in li.iter('span') if _has_class(e.get('class'), 'text-resumo')), None)
+            link_tag = next((e for e in li.iter('a') if _has_class(e.get('class'), 'link_col')), None)
+            records.append(_make_opportunity(
+                title="".join(self._strings(title_tag)) if title_tag is not None else "",
+                body="".join(self._strings(summary_tag)) if summary_tag is not None else "",
+                href=link_tag.get('href', '') if link_tag is not None else '',
+                full_text=" ".join(self._strings(li)),
+                city=self._labeled(li, 'Cidade:'),
+                institute=self._labeled(li, 'Instituição:'),
+                base_url=base_url))
+        return records
+
+
+class SelectolaxBackend:
+    """
+    selectolax backend (lexbor parser, CSS selectors).
+    """
+    name = "selectolax"
+
+    def available(self):
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+        except ImportError:
+            return False
+        return True
+
+    @staticmethod
+    def _strings(node):
+        strings = []
+        for n in node.traverse(include_text=True):
+            if n.tag == '-text':
+                t = n.text(deep=False).strip()
+                if t:
+                    strings.append(t)
+        return strings
+
+    def _labeled(self, li, label):
+        for strong in li.css('strong'):
+            if label in strong.text():
+                nxt = strong.next
+                return nxt.text(deep=False).strip() if nxt is not None and nxt.tag == '-text' else ""
+        return ""
+
+    def parse(self, html, base_url):
+        from selectolax.lexbor import LexborHTMLParser
+
+        ul = LexborHTMLParser(html).css_first('ul.list')
+        if ul is None:
+            return []
+
+        records = []
+        for li in ul.css('li'):
+            classes = li.attributes.get('class')
+            if not (_has_class(classes, 'box_col') and _has_class(classes, 'aberta')):
+                continue
+            title_tag = li.css_first('strong.title')
+            summary_tag = li.css_first('span.text-resumo')
+            link_tag = li.css_first('a.link_col')
+            records.append(_make_opportunity(
+                title="".join(self._strings(title_tag)) if title_tag is not None else "",
+                body="".join(self._strings(summary_tag)) if summary_tag is not None else "",
+                href=(link_tag.attributes.get('href') or '') if link_tag is not None else '',
+                full_text=" ".join(self._strings(li)),
+                city=self._labeled(li, 'Cidade:'),
+                institute=self._labeled(li, 'Instituição:'),
+                base_url=base_url))
+        return records
+
+
+# Em ordem de preferência para "auto"
+PARSER_BACKENDS = {
+    "selectolax": SelectolaxBackend(),
+    "lxml": LxmlBackend(),
+    "bs4-lxml": SoupBackend('lxml'),
+    "html.parser": SoupBackend('html.parser'),
+}
+
+_parser_name = "auto"
+
+
+def available_backends():
+    """
+    Returns the names of the parser backends that can be used in this installation.
+    """
+    return [name for name, backend in PARSER_BACKENDS.items() if backend.available()]
+
+
+def get_backend(name=None):
+    """
+    Returns a parser backend.
+
+    Parameters:
+        name (str): Backend name, or "auto"/None for the configured one. "auto"
+                    picks the fastest installed backend; html.parser is always available.
+
+    Returns:
+        The backend object.
+    """
+    name = name or _parser_name
+    if name != "auto" and name in PARSER_BACKENDS and PARSER_BACKENDS[name].available():
+        return PARSER_BACKENDS[name]
+    for backend in PARSER_BACKENDS.values():
+        if backend.available():
+            return backend
+    return PARSER_BACKENDS["html.parser"]
+
+
+def set_parser_backend(name):
+    """
+    Selects the backend used by the listing functions ("auto", "selectolax", "lxml", "bs4-lxml" or "html.parser").
+    """
+    global _parser_name
+    _parser_name = name
+
+
+################################################################################
+# Memo dos blocos <li>
+#
+# Os <li> da ul.list são recortados do texto por expressões regulares, também
+# enquanto a página chega aos pedaços; só os blocos cujo hash não está no memo
+# passam pelo backend, todos juntos numa única ul sintética.
+
+_LIST_RE = re.compile(r"""<ul\b[^>]*\bclass\s*=\s*(?:"[^"]*(?<![\w-])list(?![\w-])[^"]*"|'[^']*(?<![\w-])list(?![\w-])[^']*')[^>]*>""", re.I)
+_CLASS_ATTR_RE = re.compile(r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.I)
+# Tags de lista, e o início dos trechos em que tags são só texto para o parser
+_SPLIT_TOKEN_RE = re.compile(r"<(?:(script|style)\b|(!--)|(/?)(ul|ol|li)\b[^>]*>)", re.I)
+_RAW_END_RE = {"script": re.compile(r"</script\s*>", re.I),
+               "style": re.compile(r"</style\s*>", re.I),
+               "!--": re.compile(r"-->")}
+
+_memo = ParseMemo(version=RECORD_VERSION)
+
+
+def set_parse_memo(memo):
+    """
+    Replaces the ParseMemo of the listing parser; None parses every block again.
+    """
+    global _memo
+    _memo = memo
+
+
+def _is_open_item(start_tag):
+    m = _CLASS_ATTR_RE.search(start_tag)
+    classes = next((g for g in m.groups() if g is not None), "") if m else ""
+    return _has_class(classes, 'box_col') and _has_class(classes, 'aberta')
+
+
+class _ItemSplitter:
+    # Recorta os blocos <li> filhos diretos da primeira ul.list de um texto que
+    # pode chegar aos pedaços; só o trecho ainda não resolvido fica guardado
+    def __init__(self):
+        self.buf = ""
+        self.pos = 0            # onde a próxima busca começa, em buf
+        self.start = None       # início do <li> em andamento, em buf
+        self.depth = 0          # listas abertas dentro do <li>
+        self.in_list = False
+        self.done = False       # a ul.list já fechou
+
+    def feed(self, text, final=False):
+        """
+        Adds text and returns the blocks completed by it; with final=True the text ends here.
+        """
+        if self.done:
+            return []
+        buf = self.buf + text if self.buf else text
+        pos, start, depth = self.pos, self.start, self.depth
+        blocks = []
+        while True:
+            m = _SPLIT_TOKEN_RE.search(buf, pos)
+            if m is None:
+                if not final:
+                    # Uma tag pode estar cortada no fim do pedaço
+                    lt = buf.rfind("<", pos)
+                    pos = lt if lt >= 0 else len(buf)
+                break
+            raw = m.group(1) or m.group(2)
+            if raw:
+                raw_end = _RAW_END_RE[raw.lower()].search(buf, m.end())
+                if raw_end is None:
+                    # Espera o fim do script, style ou comentário
+                    pos = m.start() if not final else len(buf)
+                    break
+                pos = raw_end.end()
+                continue
+            pos = m.end()
+            closing, name = m.group(3), m.group(4).lower()
+            if not self.in_list:
+                self.in_list = not closing and name == "ul" and _LIST_RE.match(buf, m.start()) is not None
+                continue
+            if name != "li":
+                if not closing:
+                    depth += 1
+                elif depth:
+                    depth -= 1
+                else:
+                    # Fim da ul.list; um <li> sem </li> termina aqui
+                    if start is not None:
+                        blocks.append(buf[start:m.start()])
+                    start = None
+                    self.done = True
+                    break
+            elif depth == 0:
+                if start is not None:
+                    blocks.append(buf[start:m.end() if closing else m.start()])
+                start = None if closing else m.start()
+
+        keep = pos if start is None else min(start, pos)
+        self.buf = "" if self.done else buf[keep:]
+        self.pos = pos - keep
+        self.start = None if start is None else start - keep
+        self.depth = depth
+        return blocks
+
+
+def _split_items(html):
+    # Blocos <li> filhos diretos da primeira ul.list, ou None se ela não fecha
+    splitter = _ItemSplitter()
+    blocks = splitter.feed(html, final=True)
+    return blocks if splitter.done else None
+
+
+def _records_from_blocks(blocks, base_url, backend, memo, timings=None):
+    # Registros dos blocos abertos, pelo memo ou pelo backend; None se o recorte
+    # não bateu com o parser (HTML atípico)
+    blocks = [b for b in blocks if _is_open_item(b[:b.index(">") + 1])]
+    keys = [content_digest(base_url + "\n" + b) for b in blocks]
+    records = [None] * len(blocks)
+    missing = []
+    for i, key in enumerate(keys):
+        cached = memo.get(key) if memo is not None else None
+        if cached is None:
+            missing.append(i)
+        else:
+            records[i] = Opportunity.load(cached[0], cached[1:])
+
+    if missing:
+        parsed = backend.parse('<ul class="list">' + "".join(blocks[i] for i in missing) + "</ul>", base_url)
+        if len(parsed) != len(missing):
+            return None
+        for i, op in zip(missing, parsed):
+            records[i] = op
+            if memo is not None:
+                memo.put(keys[i], [op.dump(), op.folded_title, op.folded_text])
+
+    if timings is not None and memo is not None:
+        timings.add("memo", items=len(blocks) - len(missing))
+    return records
+
+
+def _parse_items(html, base_url, timings=None):
+    backend = get_backend()
+    memo = _memo
+    blocks = _split_items(html) if memo is not None else None
+    records = _records_from_blocks(blocks, base_url, backend, memo, timings) if blocks is not None else None
+    if records is None:
+        # Sem memo, ou recorte que não bateu: analisa a página inteira
+        return backend.parse(html, base_url)
+    return records
+
+
+def _parse_listing(html, page_url, base_url, with_pages, timings=None):
+    records = _parse_items(html, base_url, timings)
+    pages = find_page_urls(html, page_url) if with_pages else []
+    return records, pages
+
+
+def _load_listing(url, base_url, cache, with_pages, timings=None, stale=None):
+    start = time.perf_counter()
+    result = _download(url, cache=cache)
+    if result.stale and stale is not None:
+        stale.add(url)
+    if timings is not None:
+        timings.add("fetch", time.perf_counter() - start,
+                    nbytes=0 if result.unchanged else len(result.content))
+
+    # Página sem mudanças (304, ainda fresca ou com os mesmos bytes):
+    # reaproveita o resultado já analisado
+    digest = None if result.unchanged else result.digest
+    if cache is not None:
+        payload = cache.load_parsed(url)
+        if (payload is not None and payload.get("version") == RECORD_VERSION
+                and (result.unchanged or payload.get("digest") == digest)
+                and (payload["pages"] is not None or not with_pages)):
+            records = [Opportunity.load(v) for v in payload["records"]]
+            if timings is not None:
+                timings.add("cached", items=len(records))
+            return records, payload["pages"] or []
+
+    start = time.perf_counter()
+    records, pages = _parse_listing(result.text, url, base_url, with_pages, timings)
+    if timings is not None:
+        timings.add("parse", time.perf_counter() - start, items=len(records))
+    if cache is not None:
+        cache.store_parsed(url, {
+            "version": RECORD_VERSION,
+            "digest": digest if digest is not None else result.digest,
+            "records": [op.dump() for op in records],
+            "pages": pages if with_pages else None
+        })
+    return records, pages
+
+
+class _StreamingListing:
+    # Registros de uma página que chega aos pedaços: cada <li> fechado passa
+    # pelo memo e pelo backend configurado assim que chega
+    def __init__(self, base_url, timings=None):
+        self.base_url = base_url
+        self.timings = timings
+        self.backend = get_backend()
+        self.memo = _memo
+        self.splitter = _ItemSplitter()
+        self.chunks = []
+        self.records = []
+        self.mismatch = False   # recorte não bateu; a página inteira é analisada no fim
+
+    @property
+    def text(self):
+        if len(self.chunks) > 1:
+            self.chunks = ["".join(self.chunks)]
+        return self.chunks[0] if self.chunks else ""
+
+    def _take(self, blocks):
+        if not blocks or self.mismatch:
+            return []
+        records = _records_from_blocks(blocks, self.base_url, self.backend, self.memo, self.timings)
+        if records is None:
+            self.mismatch = True
+            return []
+        self.records += records
+        return records
+
+    def feed(self, text):
+        self.chunks.append(text)
+        return self._take(self.splitter.feed(text))
+
+    def close(self):
+        ready = self._take(self.splitter.feed("", final=True))
+        if self.mismatch or not self.splitter.done:
+            # HTML atípico: o resultado é o do backend sobre a página inteira
+            full = self.backend.parse(self.text, self.base_url)
+            sent = {op.id for op in self.records}
+            ready = [op for op in full if op.id not in sent]
+            self.records = full
+        return ready
+
+
+class ListingStream:
+    """
+    Open opportunities of a listing page, yielded while the page is downloading.
+
+    Iterating the stream downloads the page in chunks and yields each open
+    <li> as soon as its closing tag arrives; like the other paths, each block
+    is looked up in the ParseMemo and only the new ones go through the parser
+    backend. An unchanged page already in the cache yields the records parsed
+    before, without downloading. After the
+    iteration ends, pages holds the pagination links (when with_pages is True)
+    and records holds every record yielded.
+
+    Parameters:
+        url (str): The listing page.
+        base_url (str): The base URL to complete relative links.
+        cache (HttpCache): Optional response cache.
+        with_pages (bool): Whether the pagination links are needed.
+        chunk_size (int): Bytes read from the connection at a time.
+        timings (SearchTimings): Optional recorder of the fetch and parse durations.
+        stale (set): Optional set that receives the url when the site could not be
+                     reached and the last cached copy was used instead.
+    """
+    def __init__(self, url, base_url="https://fapesp.br", cache=None, with_pages=False, chunk_size=16 * 1024, timings=None, stale=None):
+        self.url = url
+        self.timings = timings
+        self.base_url = base_url
+        self.cache = cache
+        self.with_pages = with_pages
+        self.chunk_size = chunk_size
+        self.stale = stale
+        self.records = []
+        self.pages = []
+
+    def __iter__(self):
+        page = fetch_stream(self.url, cache=self.cache)
+        if page.stale and self.stale is not None:
+            self.stale.add(self.url)
+
+        # Página sem mudanças: reaproveita o resultado já analisado
+        if page.unchanged:
+            payload = self.cache.load_parsed(self.url)
+            if (payload is not None and payload.get("version") == RECORD_VERSION
+                    and (payload["pages"] is not None or not self.with_pages)):
+                self.pages = payload["pages"] or []
+                if self.timings is not None:
+                    self.timings.add("cached", items=len(payload["records"]))
+                for values in payload["records"]:
+                    op = Opportunity.load(values)
+                    self.records.append(op)
+                    yield op
+                return
+
+        listing = _StreamingListing(self.base_url, self.timings)
+        parse_seconds = 0.0
+        start = time.perf_counter()
+        try:
+            for chunk in page.iter_text(self.chunk_size):
+                t = time.perf_counter()
+                ready = listing.feed(chunk)
+                parse_seconds += time.perf_counter() - t
+                for op in ready:
+                    self.records.append(op)
+                    yield op
+            t = time.perf_counter()
+            ready = listing.close()
+            parse_seconds += time.perf_counter() - t
+            for op in ready:
+                yield op
+            self.records = listing.records
+        finally:
+            # Interrompido pelo consumidor: nada é gravado no cache
+            page.close()
+            if self.timings is not None:
+                # O tempo gasto pelo consumidor entre os itens entra em "fetch"
+                self.timings.add("fetch", time.perf_counter() - start - parse_seconds,
+                                 nbytes=0 if page.unchanged else page.nbytes)
+                self.timings.add("parse", parse_seconds, items=len(self.records))
+
+        self.pages = find_page_urls(listing.text, self.url) if self.with_pages else []
+        if self.cache is not None and page.complete:
+            # O hash da página só existe depois do último byte; com os mesmos
+            # bytes da última vez o resultado guardado continua valendo
+            payload = self.cache.load_parsed(self.url)
+            if (payload is not None and payload.get("version") == RECORD_VERSION
+                    and payload.get("digest") == page.digest
+                    and (payload["pages"] is not None or not self.with_pages)):
+                return
+            self.cache.store_parsed(self.url, {
+                "version": RECORD_VERSION,
+                "digest": page.digest,
+                "records": [op.dump() for op in self.records],
+                "pages": self.pages if self.with_pages else None
+            })
+
+
+def iter_open_opportunities(url = "https://fapesp.br/oportunidades/mais-recentes/", base_url="https://fapesp.br", cache=None):
+    """
+    Streaming version of fetch_opportunities(): yields each open opportunity
+    as soon as its <li> is downloaded, instead of returning the whole list at the end.
+
+    Parameters:
+        url (str): The URL to fetch opportunities from.
+        base_url (str): The base URL to complete relative links.
+        cache (HttpCache): Optional response cache.
+
+    Yields:
+        Opportunity: The records, in page order.
+    """
+    return iter(ListingStream(url, base_url, cache=cache))
+
+
+def extract_opportunities(html, base_url="https://fapesp.br"):
+    """
+    Parses a listing page once and converts each open <li> into an Opportunity.
+
+    The page tree is discarded before returning, so only the compact records stay in memory.
+
+    Parameters:
+        html (str): HTML of a listing page.
+        base_url (str): The base URL to complete relative links.
+
+    Returns:
+        list: A list of Opportunity records, in page order.
+    """
+    records, _ = _parse_listing(html, base_url, base_url, with_pages=False)
+    return records
+
+
+def fetch_opportunities(url = "https://fapesp.br/oportunidades/mais-recentes/", base_url="https://fapesp.br", cache=None, on_record=None, timings=None, stale=None):
+    """
+    Downloads a listing page and returns its open opportunities as parsed records.
+
+    Parameters:
+        url (str): The URL to fetch opportunities from.
+        base_url (str): The base URL to complete relative links.
+        cache (HttpCache): Optional response cache; an unchanged page reuses
+                           the records parsed on a previous call.
+        on_record (callable): Optional on_record(op); when given, the page is
+                              streamed and each record is passed to it as soon as it is parsed.
+        timings (SearchTimings): Optional recorder of the fetch and parse durations.
+        stale (set): Optional set that receives the url when the last cached copy
+                     was used because the site could not be reached.
+
+    Returns:
+        list: A list of Opportunity records.
+    """
+    if on_record is not None:
+        stream = ListingStream(url, base_url, cache=cache, timings=timings, stale=stale)
+        for op in stream:
+            on_record(op)
+        return stream.records
+
+    records, _ = _load_listing(url, base_url, cache, with_pages=False, timings=timings, stale=stale)
+    return records
+
+
+def merge_opportunities(pages):
+    """
+    Concatenates lists of records in order, keeping only the first record of each id.
+
+    Parameters:
+        pages (iterable): Lists of Opportunity records.
+
+    Returns:
+        list: The merged list without repeated ids.
+    """
+    seen = set()
+    merged = []
+    for records in pages:
+        for op in records:
+            if op.id not in seen:
+                seen.add(op.id)
+                merged.append(op)
+    return merged
+
+
+def crawl_opportunities(url = "https://fapesp.br/oportunidades/mais-recentes/",
+                        base_url="https://fapesp.br",
+                        max_pages=20,
+                        max_workers=4,
+                        cache=None,
+                        on_record=None,
+                        timings=None,
+                        stale=None,
+                        failed=None):
+    """
+    Fetches every page of a paginated listing and returns all open opportunities.
+
+    The first page is downloaded to discover the pagination links; the remaining
+    pages are fetched concurrently by a bounded thread pool sharing one keep-alive
+    session. Results are merged in page order and deduplicated by id. An error
+    on the first page is raised; an error on any other page only leaves that
+    page out, so the listing returned may then be incomplete.
+
+    Parameters:
+        url (str): The first listing page.
+        base_url (str): The base URL to complete relative links.
+        max_pages (int): Maximum number of pages to read, including the first.
+        max_workers (int): Maximum number of concurrent downloads.
+        cache (HttpCache): Optional response cache shared by all pages.
+        on_record (callable): Optional on_record(op) called with each record as
+                              soon as it is available; the first page is streamed.
+        timings (SearchTimings): Optional recorder of the fetch and parse durations.
+        stale (set): Optional set that receives the pages read from the last cached
+                     copy because the site could not be reached.
+        failed (dict): Optional dict that receives {page url: error message} of the
+                       pages after the first that could not be read.
+
+    Returns:
+        list: A list of Opportunity records.
+    """
+    if on_record is not None:
+        stream = ListingStream(url, base_url, cache=cache, with_pages=True, timings=timings, stale=stale)
+        for op in stream:
+            on_record(op)
+        first, page_urls = stream.records, stream.pages
+    else:
+        first, page_urls = _load_listing(url, base_url, cache, with_pages=True, timings=timings, stale=stale)
+    page_urls = page_urls[:max(0, max_pages - 1)]
+
+    if not page_urls:
+        return merge_opportunities([first])
+
+    def fetch_page(page_url):
+        # Uma página que falha não descarta as outras
+        try:
+            records, _ = _load_listing(page_url, base_url, cache, with_pages=False, timings=timings, stale=stale)
+        except Exception as e:
+            if failed is not None:
+                failed[page_url] = str(e) or type(e).__name__
+            return []
+        return records
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(page_urls)))) as executor:
+        # map preserva a ordem das páginas
+        others = []
+        for records in executor.map(fetch_page, page_urls):
+            if on_record is not None:
+                for op in records:
+                    on_record(op)
+            others.append(records)
+
+    return merge_opportunities([first] + others)
+
+
+class SourceStatus:
+    """
+    Outcome of one listing source in aggregate_opportunities().
+
+    Attributes:
+        url (str): The listing URL.
+        items (int): Records read from it.
+        seconds (float): Time taken by the source.
+        error (str): Error message, or None if the source was read.
+        stale (int): Pages that could not be downloaded and were read from the
+                     last cached copy instead.
+        failed_pages (dict): {page url: error message} of the pagination pages that
+                             could not be read; the items of the others are kept.
+    """
+    __slots__ = ("url", "items", "seconds", "error", "stale", "failed_pages")
+
+    def __init__(self, url, items=0, seconds=0.0, error=None, stale=0, failed_pages=None):
+        self.url = url
+        self.items = items
+        self.seconds = seconds
+        self.error = error
+        self.stale = stale
+        self.failed_pages = failed_pages or {}
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def complete(self):
+        # Lida inteira e da rede: só assim o que sumiu dela pode ser dado como encerrado
+        return self.error is None and not self.stale and not self.failed_pages
+
+    def to_dict(self):
+        return {"url": self.url, "items": self.items, "seconds": self.seconds, "error": self.error,
+                "stale": self.stale, "failed_pages": self.failed_pages}
+
+    def __repr__(self):
+        return (f"SourceStatus(url={self.url!r}, items={self.items}, error={self.error!r}, stale={self.stale}, "
+                f"failed_pages={len(self.failed_pages)})")
+
+
+def aggregate_opportunities(urls,
+                            base_url="https://fapesp.br",
+                            crawl=True,
+                            max_pages=20,
+                            max_workers=4,
+                            cache=None,
+                            on_record=None,
+                            timings=None):
+    """
+    Reads several listing URLs at the same time and merges their opportunities.
+
+    Each source runs in its own thread (crawling its pagination if crawl is True),
+    so a slow or broken source does not delay nor break the others. Records are
+    merged in source order and deduplicated by id.
+
+    Parameters:
+        urls (list): Listing URLs.
+        base_url (str): The base URL to complete relative links.
+        crawl (bool): If True each source follows its pagination.
+        max_pages (int): Maximum number of pages read from each source.
+        max_workers (int): Maximum concurrent page downloads inside each source.
+        cache (HttpCache): Optional response cache shared by all sources.
+        on_record (callable): Optional on_record(op) called as records arrive;
+                              calls from different sources are serialized.
+        timings (SearchTimings): Optional recorder of the fetch and parse durations.
+
+    Returns:
+        tuple: (records, statuses) with the merged records and one SourceStatus per URL.
+
+    Raises:
+        Exception: The error of the first source, when every source failed.
+    """
+    urls = list(dict.fromkeys(urls))
+    if on_record is not None:
+        lock = threading.Lock()
+        callback = on_record
+
+        def on_record(op):
+            with lock:
+                callback(op)
+
+    def read(url):
+        start = time.perf_counter()
+        stale = set()
+        failed = {}
+        try:
+            if crawl:
+                records = crawl_opportunities(url, base_url, max_pages=max_pages, max_workers=max_workers,
+                                              cache=cache, on_record=on_record, timings=timings, stale=stale,
+                                              failed=failed)
+            else:
+                records = fetch_opportunities(url, base_url, cache=cache, on_record=on_record, timings=timings,
+                                              stale=stale)
+        except Exception as e:
+            return [], SourceStatus(url, 0, time.perf_counter() - start, str(e) or type(e).__name__), e
+        return records, SourceStatus(url, len(records), time.perf_counter() - start, stale=len(stale),
+                                     failed_pages=failed), None
+
+    if len(urls) == 1:
+        results = [read(urls[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+            results = list(executor.map(read, urls))
+
+    statuses = [status for _, status, _ in results]
+    errors = [error for _, _, error in results if error is not None]
+    if urls and len(errors) == len(urls):
+        raise errors[0]
+    return merge_opportunities([records for records, _, _ in results]), statuses
+
+
+def _filter_by_keywords(opportunities, contents, field):
     if len(contents) == 0:
-        return lista_li_html
+        return opportunities
 
-    # Normaliza os conteúdos para minúsculas
-    contents_lower = [kw.lower() for kw in contents]
+    # Autômato compilado uma vez e compartilhado entre buscas
+    matcher = contents if isinstance(contents, KeywordMatcher) else compile_matcher(contents)
 
     filtered_result = []
-
-    for li_html in lista_li_html:
-        soup = BeautifulSoup(li_html, 'html.parser')
-        title_tag = soup.find('strong', class_='title')
-        if title_tag:
-            title_text = title_tag.get_text().lower()  # Normaliza o título
-            if any(keyword in title_text for keyword in contents_lower):
-                filtered_result.append(li_html)
+    for op in opportunities:
+        found = matcher.search(getattr(op, field), normalized=True)
+        if found:
+            op.add_hits(found)
+            filtered_result.append(op)
 
     return filtered_result
 
 
-def filter_grants_by_content(lista_li_html, contents):
+def filter_grants_by_title(opportunities, contents):
+    """
+    Filters the list of opportunities by checking if their title contains any of the specified keywords.
+
+    The comparison ignores case and accents, and the matched keywords are
+    added to the hits of each record that passes.
+
+    Parameters:
+        opportunities (list): A list of Opportunity records.
+        contents (set, list or KeywordMatcher): Strings to search for in the opportunity titles.
+
+    Returns:
+        list: Filtered list of records matching the title criteria.
+    """
+    return _filter_by_keywords(opportunities, contents, "folded_title")
+
+
+def filter_grants_by_content(opportunities, contents):
     """
     Filters the list of opportunities by checking if their full text contains any of the specified keywords.
 
+    The comparison ignores case and accents, and the matched keywords are
+    added to the hits of each record that passes.
+
     Parameters:
-        lista_li_html (list): A list of <li> elements (as HTML strings).
-        contents (set or list): Set of strings to search for in the full opportunity text.
+        opportunities (list): A list of Opportunity records.
+        contents (set, list or KeywordMatcher): Strings to search for in the full opportunity text.
 
     Returns:
-        list: Filtered list of <li> HTML strings matching the content criteria.
+        list: Filtered list of records matching the content criteria.
     """
-    if len(contents) == 0:
-        return lista_li_html
+    return _filter_by_keywords(opportunities, contents, "folded_text")
 
-    search_words = {word.lower() for word in contents}
-    filtered_result = []
 
-    for li_html in lista_li_html:
-        text = BeautifulSoup(li_html, 'html.parser').get_text().lower()
-        if any(word in text for word in search_words):
-            filtered_result.append(li_html)
+def sort_by_deadline(opportunities):
+    """
+    Sorts opportunities by deadline and id; records without a deadline go last.
+
+    Parameters:
+        opportunities (list): A list of Opportunity records.
+
+    Returns:
+        list: A new list ordered by the precomputed deadline ordinal.
+    """
+    return sorted(opportunities, key=attrgetter("deadline", "id"))
+
+
+def _make_opportunity(title, body, href, full_text, city, institute, base_url):
+    link = base_url + href if href.startswith('/') else href
+    
+    # ID
+    id_number = link.strip("/").split("/")[-1]
+    id_number = int(id_number)
+
+    date_match = re.search(r"Inscrições até:\s*(\d{2}/\d{2}/\d{4})", full_text)
+    end_date = date_match.group(1) if date_match else ""
+
+    return Opportunity(
+        title=title,
+        body=body,
+        text=full_text,
+        link=link,
+        id=id_number,
+        city=city,
+        institute=institute,
+        end_date=end_date,
+        deadline=deadline_ordinal(end_date)
+    )
 
-    return filtered_result
+
+def _text_after(tag):
+    # Texto logo após o rótulo; outro elemento no lugar conta como vazio
+    sibling = tag.next_sibling if tag else None
+    return sibling.strip() if isinstance(sibling, str) else ""
 
 
 def parse_opportunity(li_html, base_url="https://fapesp.br"):
@@ -93,17 +1169,18 @@ def parse_opportunity(li_html, base_url="https://fapesp.br"):
     Extracts structured data from a single HTML opportunity block.
 
     Parameters:
-        li_html (str): HTML string representing an opportunity.
+        li_html (str or Tag): HTML string representing an opportunity, or an
+                              already parsed <li> tag from the listing page.
         base_url (str): The base URL to complete relative links.
 
     Returns:
-        dict: A dictionary containing:
-            - title (str): The opportunity title.
-            - body (str): The summary or description.
-            - link (str): Full URL to the opportunity.
-            - end-date (str): Application deadline in DD/MM/YYYY format.
+        Opportunity: A record containing title, body, full text, link, id,
+                     city, institute, end date and the deadline ordinal.
     """
-    soup = BeautifulSoup(li_html, 'html.parser')
+    if isinstance(li_html, str):
+        soup = _parse_html(li_html)
+    else:
+        soup = li_html
     
     # Título
     title_tag = soup.find('strong', class_='title')
@@ -116,47 +1193,86 @@ def parse_opportunity(li_html, base_url="https://fapesp.br"):
     # Link (href relativo)
     link_tag = soup.find('a', class_='link_col')
     href = link_tag.get('href', '') if link_tag else ''
-    link = base_url + href if href.startswith('/') else href
-    
-    # ID
-    id_number = link.strip("/").split("/")[-1]
-    id_number = int(id_number)
-
-    # City
-    full_text = soup.get_text(" ", strip=True)
-    date_match = re.search(r"Cidade:\s*(\d{2}/\d{2}/\d{4})", full_text)
-    end_date = date_match.group(1) if date_match else ""
 
     # Extract full text from the HTML
     full_text = soup.get_text(" ", strip=True)
-    date_match = re.search(r"Inscrições até:\s*(\d{2}/\d{2}/\d{4})", full_text)
-    end_date = date_match.group(1) if date_match else ""
 
     # Find city
     strong_tag = soup.find('strong', string=lambda s: s and 'Cidade:' in s)
-    city = strong_tag.next_sibling.strip() if strong_tag and strong_tag.next_sibling else ""
+    city = _text_after(strong_tag)
 
     # institute
     strong_tag = soup.find('strong', string=lambda s: s and 'Instituição:' in s)
-    institute = strong_tag.next_sibling.strip() if strong_tag and strong_tag.next_sibling else ""
-    
-    return {
-        "title": title,
-        "body": body,
-        "link": link,
-        "id": id_number,
-        "end-date": end_date,
-        "city": city,
-        "institute": institute
-    }
-
-
-def parse_opportunities(list_html, base_url="https://fapesp.br"):
-    total_list = []
-    for item in list_html:
-        res = parse_opportunity(item, base_url=base_url)
-        total_list.append(res)
-    return total_list
+    institute = _text_after(strong_tag)
+
+    if soup is not li_html:
+        soup.decompose()
+
+    return _make_opportunity(title, body, href, full_text, str(city), str(institute), base_url)
+
+
+# Abaixo disso o custo de subir os processos supera o ganho
+PROCESS_MIN_ITEMS = 256
+PROCESS_CHUNK_SIZE = 64
+
+
+def _parse_chunk(args):
+    # Roda num processo filho; devolve listas, que são baratas de serializar
+    items, base_url = args
+    result = []
+    for item in items:
+        op = parse_opportunity(item, base_url=base_url)
+        result.append((op.dump(), op.folded_title, op.folded_text))
+    return result
+
+
+def parse_opportunities(list_html, base_url="https://fapesp.br", mode="serial",
+                        chunk_size=PROCESS_CHUNK_SIZE, max_workers=None, executor=None):
+    """
+    Parses a list of <li> HTML blocks into Opportunity records.
+
+    With mode="process" the blocks are split into chunks of chunk_size and
+    parsed by a ProcessPoolExecutor, so bulk jobs (archives of listing
+    snapshots, backfills) use every core instead of one. Results keep the
+    input order. Inputs smaller than PROCESS_MIN_ITEMS, that fit in a single
+    chunk, or that would get a single worker are parsed serially, where the
+    process start-up would cost more than the parsing; so are inputs with
+    already parsed tags, which can not be sent to other processes.
+
+    Parameters:
+        list_html (list): HTML strings (or parsed tags, serial only).
+        base_url (str): The base URL to complete relative links.
+        mode (str): "serial" or "process".
+        chunk_size (int): Blocks sent to a worker process at a time.
+        max_workers (int): Worker processes; default is the number of CPUs.
+        executor (ProcessPoolExecutor): Optional pool to reuse between calls
+                                        instead of starting a new one.
+
+    Returns:
+        list: Opportunity records, in the order of list_html.
+    """
+    if mode not in ("serial", "process"):
+        raise ValueError(f"unknown parse mode {mode!r}; use 'serial' or 'process'")
+    list_html = list(list_html)
+    chunk_size = max(1, chunk_size)
+
+    if (mode == "serial" or len(list_html) < PROCESS_MIN_ITEMS or len(list_html) <= chunk_size
+            or not all(isinstance(item, str) for item in list_html)):
+        return [parse_opportunity(item, base_url=base_url) for item in list_html]
+
+    chunks = [(list_html[i:i + chunk_size], base_url) for i in range(0, len(list_html), chunk_size)]
+    workers = min(max_workers or os.cpu_count() or 1, len(chunks))
+    if executor is None and workers < 2:
+        return [parse_opportunity(item, base_url=base_url) for item in list_html]
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    try:
+        # map devolve os lotes na ordem de envio
+        return [Opportunity.load(values, (title, text))
+                for chunk in pool.map(_parse_chunk, chunks)
+                for values, title, text in chunk]
+    finally:
+        if executor is None:
+            pool.shutdown()
 
 # Main execution block
 if __name__ == "__main__":
@@ -164,8 +1280,8 @@ if __name__ == "__main__":
     TITLES = {"Bolsa de PD"}  # Filter by this title (e.g., "Postdoctoral Fellowship")
     CONTENTS = {"computação", "elétrica", "neural", "neurais", "sinais", "machine learning"}  # Keywords to search in content
 
-    # Step 1: Retrieve all open opportunities
-    opportunities = get_open_opportunities(url=URL)
+    # Step 1: Retrieve and parse all open opportunities
+    opportunities = fetch_opportunities(url=URL)
 
     # Step 2: Filter them by title keywords
     opportunities = filter_grants_by_title(opportunities, TITLES)
@@ -174,9 +1290,8 @@ if __name__ == "__main__":
     opportunities = filter_grants_by_content(opportunities, CONTENTS)
 
     import json
-    # Step 4: Parse and display each result
+    # Step 4: Display each result
     for i, item in enumerate(opportunities, 1):
         print(f"\n--- Opportunity {i} ---\n")
-        res = parse_opportunity(item)
-        print(json.dumps(res, indent=2, ensure_ascii=False))
+        print(json.dumps(item.to_dict(), indent=2, ensure_ascii=False))
 
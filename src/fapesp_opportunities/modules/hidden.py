@@ -0,0 +1,110 @@
+import os
+import threading
+
+
+class HiddenIds:
+    """
+    Set of hidden opportunity ids backed by an append-only journal.
+
+    Hiding or restoring an id only appends one line ("+id" or "-id") to the
+    journal; the "avoid_ids" list of the configuration is rewritten later, in a
+    single step, by compact(). Membership tests use an in-memory set.
+
+    Parameters:
+        journal_path (str): Path of the journal file.
+        config (ConfigService): Configuration that owns "avoid_ids".
+    """
+    def __init__(self, journal_path, config):
+        self.journal_path = journal_path
+        self.config = config
+        self._lock = threading.Lock()
+        self._added = set()
+        self._removed = set()
+        self._replay()
+
+    def _replay(self):
+        # Reaplica o que ficou no diário se o programa fechou antes da compactação
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if len(line) < 2 or not line[1:].isdigit():
+                        continue
+                    self._apply(line[0], int(line[1:]))
+        except OSError:
+            pass
+
+    def _apply(self, op, id_number):
+        if op == "+":
+            self._added.add(id_number)
+            self._removed.discard(id_number)
+        elif op == "-":
+            self._removed.add(id_number)
+            self._added.discard(id_number)
+
+    def _append(self, op, ids):
+        os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            for id_number in ids:
+                f.write(f"{op}{id_number}\n")
+                self._apply(op, id_number)
+            f.flush()
+            os.fsync(f.fileno())
+
+    ############################################################################
+    def hide(self, ids):
+        """
+        Hides a batch of ids.
+        """
+        with self._lock:
+            self._append("+", list(ids))
+
+    def unhide(self, ids):
+        """
+        Restores a batch of hidden ids (used by undo).
+        """
+        with self._lock:
+            self._append("-", list(ids))
+
+    def effective(self):
+        """
+        Returns the hidden ids as a set.
+
+        Returns:
+            set: ("avoid_ids" - restored ids) | hidden ids not compacted yet.
+        """
+        with self._lock:
+            return (self.config.avoid_ids - self._removed) | self._added
+
+    def pending(self):
+        """
+        Returns True if the journal has changes not compacted into the configuration.
+        """
+        with self._lock:
+            return bool(self._added or self._removed)
+
+    def compact(self, expired=None):
+        """
+        Writes the hidden ids into "avoid_ids" of the configuration and empties the journal.
+
+        Parameters:
+            expired (callable): Optional function that receives the set of hidden
+                                ids and returns those whose deadline has passed;
+                                they are dropped from the list.
+
+        Returns:
+            list: The new "avoid_ids" list.
+        """
+        with self._lock:
+            ids = (self.config.avoid_ids - self._removed) | self._added
+            if expired is not None:
+                ids -= set(expired(ids))
+            avoid_ids = sorted(ids)
+            self.config.update(avoid_ids=avoid_ids)
+            # O diário só é esvaziado depois que a configuração está no disco
+            self.config.flush()
+
+            open(self.journal_path, 'w', encoding='utf-8').close()
+            self._added.clear()
+            self._removed.clear()
+            return avoid_ids
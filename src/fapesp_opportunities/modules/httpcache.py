@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+
+class HttpCache:
+    """
+    Persistent cache of HTTP responses with ETag / Last-Modified revalidation.
+
+    Each entry keeps the raw body, the validators sent by the server and,
+    optionally, a JSON payload with the result already parsed from that body,
+    so a response that did not change never goes through the parser again.
+
+    Layout of the directory:
+        index.json          Metadata of every entry (validators, size, times).
+        <key>.body          Raw bytes of the response.
+        <key>.parsed.json   Parsed payload stored with store_parsed().
+
+    Entries newer than max_age seconds are served without contacting the
+    server. When the total size passes max_bytes, the least recently used
+    entries are removed.
+    """
+    def __init__(self, directory, max_age=300, max_bytes=20 * 1024 * 1024):
+        self.directory = directory
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(directory, "index.json")
+        self._index = self._read_index()
+
+    ############################################################################
+    def _read_index(self):
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _write_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+
+    def _path(self, url, suffix):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key + suffix)
+
+    def _remove_files(self, url):
+        for suffix in (".body", ".parsed.json"):
+            try:
+                os.remove(self._path(url, suffix))
+            except OSError:
+                pass
+
+    def _evict(self):
+        total = sum(e["size"] for e in self._index.values())
+        if total <= self.max_bytes:
+            return
+        # Remove as entradas menos usadas recentemente (LRU)
+        for url in sorted(self._index, key=lambda u: self._index[u]["accessed"]):
+            if total <= self.max_bytes:
+                break
+            total -= self._index[url]["size"]
+            del self._index[url]
+            self._remove_files(url)
+
+    ############################################################################
+    def validators(self, url):
+        """
+        Returns the conditional request headers for a cached URL.
+
+        Returns:
+            dict: If-None-Match and/or If-Modified-Since, empty if the URL is not cached.
+        """
+        with self._lock:
+            entry = self._index.get(url)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last-modified"):
+                headers["If-Modified-Since"] = entry["last-modified"]
+        return headers
+
+    def is_fresh(self, url):
+        """
+        Returns True if the URL was fetched or revalidated less than max_age seconds ago.
+        """
+        with self._lock:
+            entry = self._index.get(url)
+        return bool(entry) and time.time() - entry["fetched"] < self.max_age
+
+    def load_body(self, url):
+        """
+        Returns the cached body of a URL.
+
+        Returns:
+            tuple: (body bytes, encoding) or None if the URL is not cached.
+        """
+        with self._lock:
+            if url not in self._index:
+                return None
+            self._index[url]["accessed"] = time.time()
+            encoding = self._index[url].get("encoding")
+        try:
+            with open(self._path(url, ".body"), 'rb') as f:
+                return f.read(), encoding
+        except OSError:
+            return None
+
+    def load_parsed(self, url):
+        """
+        Returns the parsed payload stored for a URL, or None.
+        """
+        with self._lock:
+            if url not in self._index or not self._index[url].get("parsed"):
+                return None
+            self._index[url]["accessed"] = time.time()
+        try:
+            with open(self._path(url, ".parsed.json"), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def store(self, url, body, etag=None, last_modified=None, encoding=None):
+        """
+        Saves a downloaded body and its validators, dropping any old parsed payload
+        unless the body has exactly the same bytes as the cached one.
+
+        Parameters:
+            url (str): The requested URL.
+            body (bytes): Raw body of the response.
+            etag (str): Value of the ETag header, if any.
+            last_modified (str): Value of the Last-Modified header, if any.
+            encoding (str): Encoding of the body, if known.
+        """
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        with self._lock:
+            now = time.time()
+            entry = self._index.get(url)
+            if entry is not None and entry.get("digest") == digest:
+                # Mesmos bytes, sem validadores que evitassem o download:
+                # o corpo e o resultado analisado continuam valendo
+                entry.update({"etag": etag, "last-modified": last_modified, "encoding": encoding,
+                              "fetched": now, "accessed": now})
+                self._write_index()
+                return
+
+            os.makedirs(self.directory, exist_ok=True)
+            self._remove_files(url)
+            with open(self._path(url, ".body"), 'wb') as f:
+                f.write(body)
+            self._index[url] = {
+                "etag": etag,
+                "last-modified": last_modified,
+                "encoding": encoding,
+                "fetched": now,
+                "accessed": now,
+                "size": len(body),
+                "digest": digest,
+                "parsed": False
+            }
+            self._evict()
+            self._write_index()
+
+    def store_parsed(self, url, payload):
+        """
+        Saves the result parsed from the cached body of a URL.
+
+        Parameters:
+            url (str): The cached URL.
+            payload: Any JSON serializable object.
+        """
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        with self._lock:
+            if url not in self._index:
+                return
+            with open(self._path(url, ".parsed.json"), 'wb') as f:
+                f.write(data)
+            entry = self._index[url]
+            entry["size"] += len(data) - entry.get("parsed-size", 0)
+            entry["parsed-size"] = len(data)
+            entry["parsed"] = True
+            self._evict()
+            self._write_index()
+
+    def revalidated(self, url, etag=None, last_modified=None):
+        """
+        Marks a cached URL as confirmed by the server (HTTP 304).
+        """
+        with self._lock:
+            entry = self._index.get(url)
+            if not entry:
+                return
+            now = time.time()
+            entry["fetched"] = now
+            entry["accessed"] = now
+            if etag:
+                entry["etag"] = etag
+            if last_modified:
+                entry["last-modified"] = last_modified
+            self._write_index()
+
+    def clear(self):
+        """
+        Removes every entry of the cache.
+        """
+        with self._lock:
+            for url in list(self._index):
+                self._remove_files(url)
+            self._index = {}
+            self._write_index()
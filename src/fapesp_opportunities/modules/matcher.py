@@ -0,0 +1,146 @@
+import unicodedata
+from collections import deque
+from functools import lru_cache
+
+# Abaixo disto, "palavra in texto" (em C) ganha da varredura do autômato em Python
+AUTOMATON_MIN_KEYWORDS = 80
+
+
+def normalize_text(text):
+    """
+    Folds a text for accent and case insensitive comparison.
+
+    The text is decomposed with NFKD, the combining marks are dropped and the
+    result is casefolded, so "Computação" and "computacao" become equal.
+
+    Parameters:
+        text (str): Text to normalize.
+
+    Returns:
+        str: The folded text.
+    """
+    if text.isascii():
+        return text.casefold()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+class KeywordMatcher:
+    """
+    Finds every keyword of a list in a text.
+
+    Keywords and texts are compared after normalize_text, so the search is accent
+    and case insensitive. With AUTOMATON_MIN_KEYWORDS keywords or more, an
+    Aho-Corasick automaton finds them all in a single pass over the text, whose
+    cost depends on the length of the text, not on the number of keywords. With
+    fewer keywords one substring check per keyword is faster, and is used instead.
+    """
+    def __init__(self, keywords):
+        self.keywords = tuple(keywords)
+        self._folded = tuple((index, folded) for index, folded in
+                             ((i, normalize_text(k)) for i, k in enumerate(self.keywords)) if folded)
+        self._automaton = len(self._folded) >= AUTOMATON_MIN_KEYWORDS
+        if not self._automaton:
+            return
+
+        # Nó 0 é a raiz; cada nó tem transições, link de falha e saídas
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        for index, folded in self._folded:
+            node = 0
+            for char in folded:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] = self._out[node] + (index,)
+
+        # Links de falha em largura (BFS)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def _scan(self, text, normalized):
+        if not normalized:
+            text = normalize_text(text)
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                yield out[node]
+
+    def search(self, text, normalized=False):
+        """
+        Finds which keywords occur in a text.
+
+        Parameters:
+            text (str): Text to scan.
+            normalized (bool): True if the text was already folded with normalize_text.
+
+        Returns:
+            list: The keywords found, in the order they were given to the matcher.
+        """
+        if not self._automaton:
+            if not normalized:
+                text = normalize_text(text)
+            found = {index for index, folded in self._folded if folded in text}
+        else:
+            found = set()
+            for indices in self._scan(text, normalized):
+                found.update(indices)
+        return [self.keywords[i] for i in sorted(found)]
+
+    def matches(self, text, normalized=False):
+        """
+        Returns True as soon as any keyword is found in the text.
+        """
+        if not self._automaton:
+            if not normalized:
+                text = normalize_text(text)
+            return any(folded in text for _, folded in self._folded)
+        for _ in self._scan(text, normalized):
+            return True
+        return False
+
+
+@lru_cache(maxsize=32)
+def _compile(keyset):
+    return KeywordMatcher(sorted(keyset))
+
+
+def compile_matcher(keywords):
+    """
+    Returns the compiled matcher for a keyword list.
+
+    Matchers are cached by keyword set, so the same list coming from the default
+    configuration or from the user config is compiled only once.
+
+    Parameters:
+        keywords (set or list): Keywords to search for.
+
+    Returns:
+        KeywordMatcher: The shared compiled matcher.
+    """
+    return _compile(frozenset(keywords))
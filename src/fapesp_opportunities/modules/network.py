@@ -0,0 +1,487 @@
+import time
+import codecs
+import random
+import hashlib
+import threading
+from urllib.parse import urlsplit
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive"
+}
+
+POOL_SIZE = 8
+
+# Respostas que valem uma nova tentativa
+RETRY_STATUS = frozenset((429, 500, 502, 503, 504))
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """Raised without any request while the circuit breaker of a host is open."""
+    pass
+
+
+class FetchPolicy:
+    """
+    Limits of every request sent by fetch() and fetch_stream().
+
+    The worst case of one fetch is about max_time plus one connect and read
+    timeout: a retry that would start after max_time is not attempted.
+
+    Parameters:
+        connect_timeout (float): Seconds to open the connection.
+        read_timeout (float): Seconds without receiving any byte.
+        retries (int): Extra attempts after a connection error, a timeout or a
+                       429/5xx response.
+        backoff (float): Base of the exponential backoff, in seconds; each wait
+                         is random between 0 and backoff * 2 ** attempt (full jitter).
+        max_backoff (float): Longest wait between two attempts.
+        max_time (float): Seconds after which no new attempt is started.
+        rate (float): Requests per second to a host (token bucket); 0 disables the limit.
+        burst (int): Requests a host may receive at once after a quiet period.
+        breaker_failures (int): Failed fetches in a row that open the circuit of a host.
+        breaker_cooldown (float): Seconds the circuit stays open before one trial request.
+    """
+    def __init__(self, connect_timeout=5.0, read_timeout=20.0, retries=2, backoff=0.5, max_backoff=8.0,
+                 max_time=60.0, rate=4.0, burst=8, breaker_failures=3, breaker_cooldown=300.0):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_time = max_time
+        self.rate = rate
+        self.burst = burst
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+
+    @property
+    def timeout(self):
+        return (self.connect_timeout, self.read_timeout)
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Returns the seconds to wait before the attempt number attempt + 1.
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+class TokenBucket:
+    """
+    Token bucket shared by the threads that send requests to one host.
+
+    acquire() takes one token, waiting until one is available; tokens come
+    back at rate per second, up to burst.
+    """
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Saldo negativo é a fila de quem já reservou a sua vez
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a host after several failed fetches in a row.
+
+    While open, allow() is False; after the cooldown one trial request is let
+    through, and its outcome closes or reopens the circuit.
+    """
+    def __init__(self, failures, cooldown):
+        self.failures = failures
+        self.cooldown = cooldown
+        self._count = 0
+        self._opened = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self._opened is None:
+                return True
+            if not self._trial and time.monotonic() - self._opened >= self.cooldown:
+                self._trial = True
+                return True
+            return False
+
+    def retry_in(self):
+        with self._lock:
+            if self._opened is None:
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - self._opened))
+
+    def success(self):
+        with self._lock:
+            self._count = 0
+            self._opened = None
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self._count += 1
+            if self._trial or (self.failures > 0 and self._count >= self.failures):
+                self._opened = time.monotonic()
+                self._trial = False
+
+
+_policy = FetchPolicy()
+_hosts = {}
+_hosts_lock = threading.Lock()
+
+
+def set_fetch_policy(policy):
+    """
+    Replaces the FetchPolicy of the following requests.
+
+    The token buckets and circuit breakers of the hosts are kept; only their limits change.
+    """
+    global _policy
+    with _hosts_lock:
+        _policy = policy
+        for bucket, breaker in _hosts.values():
+            bucket.rate, bucket.burst = policy.rate, policy.burst
+            breaker.failures, breaker.cooldown = policy.breaker_failures, policy.breaker_cooldown
+
+
+def _host(url):
+    host = urlsplit(url).netloc
+    with _hosts_lock:
+        state = _hosts.get(host)
+        if state is None:
+            state = _hosts[host] = (TokenBucket(_policy.rate, _policy.burst),
+                                    CircuitBreaker(_policy.breaker_failures, _policy.breaker_cooldown))
+        return host, state
+
+
+def is_transient(error):
+    """
+    Tells whether a fetch error is worth a later retry (network down, timeout,
+    overloaded server or open circuit) rather than a problem of the request itself.
+    """
+    import requests
+
+    if isinstance(error, (CircuitOpenError, requests.ConnectionError, requests.Timeout)):
+        return True
+    response = getattr(error, "response", None)
+    return isinstance(error, requests.HTTPError) and response is not None and response.status_code in RETRY_STATUS
+
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+def _get(session, url, **kwargs):
+    # GET com timeouts, token bucket do host, novas tentativas e disjuntor
+    import requests
+
+    policy = _policy
+    host, (bucket, breaker) = _host(url)
+    if not breaker.allow():
+        raise CircuitOpenError(f"{host} failed {breaker.failures} times in a row; "
+                               f"next attempt in {breaker.retry_in():.0f} s")
+
+    give_up = time.monotonic() + policy.max_time
+    attempt = 0
+    while True:
+        bucket.acquire()
+        response = error = None
+        try:
+            response = session.get(url, timeout=policy.timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+        except Exception:
+            # Erro que não vale repetir (TooManyRedirects, InvalidURL...); ainda
+            # assim conta, senão a tentativa do disjuntor meio aberto nunca termina
+            breaker.failure()
+            raise
+        else:
+            if response.status_code not in RETRY_STATUS:
+                breaker.success()
+                return response
+
+        delay = policy.delay(attempt, _retry_after(response) if response is not None else None)
+        if attempt >= policy.retries or time.monotonic() + delay > give_up:
+            breaker.failure()
+            if error is not None:
+                raise error
+            # O chamador decide o que fazer com o 429/5xx (raise_for_status)
+            return response
+        if response is not None:
+            response.close()
+        time.sleep(delay)
+        attempt += 1
+
+
+def get_session():
+    """
+    Returns the HTTP session shared by every fetch of the program.
+
+    The session keeps connections alive between calls and its connection pool is
+    large enough for the crawler threads, so pages of the same host reuse the
+    TCP/TLS connections instead of opening new ones.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            # requests só é importado no primeiro download
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+class FetchResult:
+    """
+    Body of a fetched page.
+
+    Attributes:
+        url (str): The requested URL.
+        content (bytes): Raw body.
+        encoding (str): Encoding of the body, or None if unknown.
+        unchanged (bool): True if the body came from the cache without changes
+                          (still fresh or confirmed by a 304 response).
+        stale (bool): True if the site could not be reached and the body is the
+                      last cached copy, however old.
+    """
+    __slots__ = ("url", "content", "encoding", "unchanged", "stale")
+
+    def __init__(self, url, content, encoding=None, unchanged=False, stale=False):
+        self.url = url
+        self.content = content
+        self.encoding = encoding
+        self.unchanged = unchanged
+        self.stale = stale
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    @property
+    def digest(self):
+        # Mesmo hash de StreamedPage.digest
+        return hashlib.blake2b(self.content, digest_size=16).hexdigest()
+
+    # O corpo já está inteiro na memória
+    complete = True
+
+    def iter_text(self, chunk_size=None):
+        yield self.text
+
+    def close(self):
+        pass
+
+
+def _response_encoding(response):
+    # Sem charset no cabeçalho o requests supõe ISO-8859-1; o site usa UTF-8
+    content_type = response.headers.get("Content-Type", "").lower()
+    return response.encoding if "charset=" in content_type else None
+
+
+class StreamedPage:
+    """
+    Body of a page that is still being downloaded.
+
+    iter_text() decodes the body chunk by chunk as it arrives. When the body was
+    read to the end it is stored in the cache, like a page returned by fetch().
+
+    Attributes:
+        url (str): The requested URL.
+        encoding (str): Encoding of the body, or None if unknown.
+        unchanged (bool): Always False; unchanged pages are returned as FetchResult.
+        complete (bool): True once the whole body was read.
+        nbytes (int): Bytes received so far.
+        digest (str): blake2b hash of the bytes received so far (see parsememo.content_digest).
+    """
+    unchanged = False
+    stale = False
+
+    def __init__(self, url, response, cache=None):
+        self.url = url
+        self.encoding = _response_encoding(response)
+        self.complete = False
+        self.nbytes = 0
+        self._hash = hashlib.blake2b(digest_size=16)
+        self._response = response
+        self._cache = cache
+
+    def iter_text(self, chunk_size=16 * 1024):
+        decoder = codecs.getincrementaldecoder(self.encoding or "utf-8")(errors="replace")
+        body = [] if self._cache is not None else None
+        try:
+            for chunk in self._response.iter_content(chunk_size=chunk_size):
+                self.nbytes += len(chunk)
+                self._hash.update(chunk)
+                if body is not None:
+                    body.append(chunk)
+                text = decoder.decode(chunk)
+                if text:
+                    yield text
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+            self.complete = True
+        finally:
+            self._response.close()
+
+        if body is not None:
+            headers = self._response.headers
+            self._cache.store(self.url, b"".join(body),
+                              etag=headers.get("ETag"),
+                              last_modified=headers.get("Last-Modified"),
+                              encoding=self.encoding)
+
+    @property
+    def digest(self):
+        return self._hash.hexdigest()
+
+    def close(self):
+        self._response.close()
+
+
+def fetch(url, session=None, cache=None):
+    """
+    Downloads a page, revalidating it against an HttpCache when one is given.
+
+    A cached page newer than the cache max_age is returned without any request.
+    Otherwise a conditional request (If-None-Match / If-Modified-Since) is sent
+    and a 304 response reuses the cached body. Requests follow the FetchPolicy
+    (timeouts, retries, rate limit, circuit breaker); when they still fail with
+    a transient error the last cached body is returned, marked as stale.
+
+    Parameters:
+        url (str): The URL to fetch.
+        session (requests.Session): Session to use. Default is get_session().
+        cache (HttpCache): Optional persistent cache.
+
+    Returns:
+        FetchResult: The body and whether it is unchanged since it was cached.
+    """
+    session = session or get_session()
+
+    if cache is not None and cache.is_fresh(url):
+        cached = cache.load_body(url)
+        if cached is not None:
+            return FetchResult(url, cached[0], cached[1], unchanged=True)
+
+    headers = cache.validators(url) if cache is not None else {}
+    try:
+        response = _get(session, url, headers=headers)
+
+        if response.status_code == 304 and cache is not None:
+            cached = cache.load_body(url)
+            if cached is not None:
+                cache.revalidated(url,
+                                  etag=response.headers.get("ETag"),
+                                  last_modified=response.headers.get("Last-Modified"))
+                return FetchResult(url, cached[0], cached[1], unchanged=True)
+            # O corpo sumiu do disco; pede a página inteira de novo
+            response = _get(session, url)
+
+        response.raise_for_status()
+    except Exception as e:
+        stale = _serve_stale(url, cache, e)
+        if stale is None:
+            raise
+        return stale
+    encoding = _response_encoding(response)
+
+    if cache is not None:
+        cache.store(url, response.content,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    encoding=encoding)
+
+    return FetchResult(url, response.content, encoding)
+
+
+def _serve_stale(url, cache, error):
+    # Última cópia boa da página quando o site está fora do ar
+    if cache is None or not is_transient(error):
+        return None
+    cached = cache.load_body(url)
+    if cached is None:
+        return None
+    return FetchResult(url, cached[0], cached[1], unchanged=True, stale=True)
+
+
+def fetch_stream(url, session=None, cache=None):
+    """
+    Starts downloading a page without waiting for its body.
+
+    Like fetch(), a fresh cached page is returned without any request and a
+    304 response reuses the cached body; in those cases the result is a
+    FetchResult. Otherwise the response is streamed and a StreamedPage is returned.
+    Both have iter_text(), unchanged and stale. Requests follow the FetchPolicy
+    and fall back to the cached body like fetch().
+
+    Parameters:
+        url (str): The URL to fetch.
+        session (requests.Session): Session to use. Default is get_session().
+        cache (HttpCache): Optional persistent cache.
+
+    Returns:
+        FetchResult or StreamedPage: The page.
+    """
+    session = session or get_session()
+
+    if cache is not None and cache.is_fresh(url):
+        cached = cache.load_body(url)
+        if cached is not None:
+            return FetchResult(url, cached[0], cached[1], unchanged=True)
+
+    headers = cache.validators(url) if cache is not None else {}
+    try:
+        response = _get(session, url, headers=headers, stream=True)
+
+        if response.status_code == 304 and cache is not None:
+            response.close()
+            cached = cache.load_body(url)
+            if cached is not None:
+                cache.revalidated(url,
+                                  etag=response.headers.get("ETag"),
+                                  last_modified=response.headers.get("Last-Modified"))
+                return FetchResult(url, cached[0], cached[1], unchanged=True)
+            # O corpo sumiu do disco; pede a página inteira de novo
+            response = _get(session, url, stream=True)
+
+        if not response.ok:
+            response.close()
+        response.raise_for_status()
+    except Exception as e:
+        stale = _serve_stale(url, cache, e)
+        if stale is None:
+            raise
+        return stale
+    return StreamedPage(url, response, cache)
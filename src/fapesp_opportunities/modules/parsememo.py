@@ -0,0 +1,110 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+def content_digest(data):
+    """
+    Returns a short hash of a str or bytes block.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ParseMemo:
+    """
+    Parsed records of <li> blocks, keyed by the hash of their HTML.
+
+    A listing page that changed usually differs from the previous one by a few
+    items; the blocks whose bytes did not change are looked up here instead of
+    going through the parser. The memo is a bounded LRU in memory and, when a
+    path is given, is loaded from and saved to a JSON file.
+
+    Parameters:
+        max_items (int): Maximum number of blocks kept.
+        path (str): Optional JSON file of the persisted copy.
+        version (int): Format of the stored values; a file of another version is ignored.
+    """
+    def __init__(self, max_items=4096, path=None, version=1):
+        self.max_items = max_items
+        self.path = path
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._loaded = path is None
+
+    def _load(self):
+        # Lido só no primeiro uso
+        self._loaded = True
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if data.get("version") != self.version:
+            return
+        for key, values in data.get("items", [])[-self.max_items:]:
+            self._items[key] = values
+
+    def get(self, key):
+        """
+        Returns the values stored for key, or None.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            values = self._items.get(key)
+            if values is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return values
+
+    def put(self, key, values):
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            self._items[key] = values
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+            self._dirty = True
+
+    def save(self):
+        """
+        Writes the persisted copy if anything was added since the last save.
+
+        Saves from several threads are serialized, and each one writes its own
+        temporary file, so a save never overwrites a file another one is renaming.
+        """
+        # Cópia tirada e gravada sob a mesma trava: a mais nova é a última a entrar
+        with self._save_lock:
+            with self._lock:
+                if self.path is None or not self._dirty:
+                    return
+                data = {"version": self.version, "items": list(self._items.items())}
+                self._dirty = False
+            directory = os.path.dirname(self.path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self.path) + ".", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                with self._lock:
+                    self._dirty = True
+                raise
+
+    def __len__(self):
+        return len(self._items)
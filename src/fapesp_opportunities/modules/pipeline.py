@@ -0,0 +1,287 @@
+import os
+import time
+import cProfile
+import threading
+from datetime import date, datetime
+
+import fapesp_opportunities.about as about
+import fapesp_opportunities.modules.configure as configure
+import fapesp_opportunities.modules.fapesp as fapesp
+import fapesp_opportunities.modules.httpcache as httpcache
+import fapesp_opportunities.modules.network as network
+import fapesp_opportunities.modules.parsememo as parsememo
+import fapesp_opportunities.modules.store as store
+import fapesp_opportunities.modules.hidden as hidden
+import fapesp_opportunities.modules.details as details
+import fapesp_opportunities.modules.timing as timing
+import fapesp_opportunities.modules.textindex as textindex
+from fapesp_opportunities.modules.query import query_from_keywords
+
+# Caminho para o arquivo de configuração
+CONFIG_PATH = os.path.join(os.path.expanduser("~"),
+                            ".config",
+                            about.__package__,
+                            "config.json")
+
+
+class SearchCancelled(Exception):
+    """Raised inside buscar_oportunidades when its caller cancelled the search."""
+    pass
+
+
+class SearchContext:
+    """
+    Everything a search needs, kept next to the configuration file.
+
+    Attributes:
+        config (ConfigService): Configuration loaded once and kept in memory.
+        http_cache (HttpCache): Cache of the downloaded listing pages.
+        store (OpportunityStore): Local database of the opportunities already seen.
+        detail_cache (DetailCache): Text of the announcement pages, by id.
+        parse_memo (ParseMemo): Parsed records of the listing <li> blocks, by hash.
+        hidden (HiddenIds): Hidden ids, journaled and compacted into "avoid_ids".
+        sources (list): SourceStatus of each listing URL in the last online search.
+        stale (str): Why the last online search showed old data (site unreachable),
+                     or None if the listing was downloaded.
+        detail_failures (dict): {page url: error message} of the announcement pages
+                                that the last online search could not download.
+        index (SearchIndex): Full-text index of every stored opportunity, rebuilt by
+                             the online searches when the store changes; None until
+                             the first one.
+    """
+    def __init__(self, config_path):
+        base_dir = os.path.dirname(config_path)
+        self.config_path = config_path
+        self.config = configure.get_service(config_path)
+        self.http_cache = httpcache.HttpCache(os.path.join(base_dir, "http-cache"))
+        self.store = store.OpportunityStore(os.path.join(base_dir, "opportunities.sqlite3"))
+        self.detail_cache = details.DetailCache(os.path.join(base_dir, "details"))
+        self.parse_memo = parsememo.ParseMemo(path=os.path.join(base_dir, "parse-memo.json"),
+                                              version=fapesp.RECORD_VERSION)
+        self.hidden = hidden.HiddenIds(os.path.join(base_dir, "avoid_ids.journal"), self.config)
+        self.index = None
+        self.sources = []
+        self.stale = None
+        self.detail_failures = {}
+
+
+_contexts = {}
+_contexts_lock = threading.Lock()
+
+
+def get_context(config_path=CONFIG_PATH):
+    """
+    Returns the shared SearchContext of a configuration file, creating it on first use.
+    """
+    with _contexts_lock:
+        if config_path not in _contexts:
+            _contexts[config_path] = SearchContext(config_path)
+        return _contexts[config_path]
+
+
+def fetch_policy(conf):
+    """
+    Returns the network.FetchPolicy described by a configuration.
+    """
+    return network.FetchPolicy(connect_timeout=conf["fetch-connect-timeout"],
+                               read_timeout=conf["fetch-read-timeout"],
+                               retries=conf["fetch-retries"],
+                               max_time=conf["fetch-max-time"],
+                               rate=conf["fetch-rate"],
+                               burst=conf["fetch-burst"],
+                               breaker_failures=conf["breaker-failures"],
+                               breaker_cooldown=conf["breaker-cooldown"])
+
+
+def source_urls(conf):
+    """
+    Returns the listing URLs of a configuration; "url" may be a string or a list.
+    """
+    urls = conf["url"]
+    return [urls] if isinstance(urls, str) else list(urls)
+
+
+def _live_filter(ctx, query, unknown, partial):
+    # Mesma consulta da busca, aplicada a cada registro que chega;
+    # partial recebe a lista dos que passaram até agora
+    hidden_ids = ctx.hidden.effective()
+    today = date.today().toordinal()
+    passed = []
+    seen = set()
+
+    def on_record(op):
+        if op.id in seen or op.id in hidden_ids or op.deadline < today:
+            return
+        seen.add(op.id)
+        found = []
+        if query.matches(op, found, unknown) is False:
+            return
+        live = fapesp.Opportunity.load(op.dump())
+        live.add_hits(found)
+        passed.append(live)
+        partial(list(passed))
+
+    return on_record
+
+
+def buscar_oportunidades(config_path=CONFIG_PATH, online=True, progress=None, is_cancelled=None, partial=None, timings=None):
+    """
+    Returns the opportunities that pass the configured filters, ordered by deadline.
+
+    Parameters:
+        config_path (str): Path of the JSON configuration.
+        online (bool): If True, the listing is downloaded and synchronized with
+                       the local store first; if False, only the store is queried.
+        progress (callable): Optional progress(stage, percent) callback.
+        is_cancelled (callable): Optional function; when it returns True the
+                                 search stops at the next stage with SearchCancelled.
+        partial (callable): Optional partial(opportunities) callback; when given,
+                            the listing is streamed and it receives the records that
+                            already pass the filters while the pages are still downloading.
+        timings (SearchTimings): Optional recorder of the stage durations. When it is
+                                 given the caller logs it (it may add stages of its own);
+                                 otherwise the search logs its own timings.
+
+    Returns:
+        list: Opportunity records. If "query" is malformed the keyword lists
+              are used instead; ctx.config.query_error tells the caller why.
+    """
+    ctx = get_context(config_path)
+    conf = ctx.config.snapshot()
+    query = ctx.config.query
+    if query is None:
+        # Consulta inválida: volta às listas de palavras; quem chama avisa o usuário
+        query = query_from_keywords(conf["title-contents"], conf["title-contents-filters"], conf["body-contents"])
+    timing.enable_log(conf["timing-log"])
+
+    owns_timings = timings is None
+    if owns_timings:
+        timings = timing.SearchTimings()
+    if ctx.config.query_error:
+        timings.note("query_error", ctx.config.query_error)
+
+    # Perfil opcional de cada busca, gravado ao lado da configuração
+    profiler = cProfile.Profile() if conf["profile-searches"] else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        results = _buscar(ctx, conf, query, online, progress, is_cancelled, partial, timings)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profile_dir = os.path.join(os.path.dirname(ctx.config_path), "profiles")
+            os.makedirs(profile_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(profile_dir, datetime.now().strftime("search-%Y%m%d-%H%M%S.prof")))
+
+    if owns_timings:
+        timing.log_timings(timings, results=len(results), online=online)
+    return results
+
+
+def _buscar(ctx, conf, query, online, progress, is_cancelled, partial, timings):
+    current = [None, time.perf_counter()]
+
+    def stage(name, percent, key=None):
+        # Fecha a etapa anterior e começa a próxima
+        now = time.perf_counter()
+        if current[0] is not None:
+            timings.add(current[0], now - current[1])
+        current[0], current[1] = key, now
+        if is_cancelled is not None and is_cancelled():
+            raise SearchCancelled()
+        if progress is not None:
+            progress(name, percent)
+
+    # Com "details-fetch" o texto completo só é conhecido depois de baixar os editais
+    unknown = ("body",) if conf["details-fetch"] else ()
+
+    if online:
+        stage("Downloading", 10, "download")
+        ctx.http_cache.max_age = conf["cache-max-age"]
+        ctx.http_cache.max_bytes = conf["cache-max-bytes"]
+        fapesp.set_parser_backend(conf["parser"])
+        network.set_fetch_policy(fetch_policy(conf))
+        fapesp.set_parse_memo(ctx.parse_memo)
+
+        on_record = _live_filter(ctx, query, unknown, partial) if partial is not None else None
+
+        # Cada <li> é analisado uma única vez e vira um registro compacto;
+        # as fontes são lidas ao mesmo tempo e uma falha não derruba as outras
+        try:
+            opportunities, sources = fapesp.aggregate_opportunities(source_urls(conf),
+                                                                    base_url="https://fapesp.br",
+                                                                    crawl=conf["crawl-pages"],
+                                                                    max_pages=conf["crawl-max-pages"],
+                                                                    max_workers=conf["crawl-workers"],
+                                                                    cache=ctx.http_cache,
+                                                                    on_record=on_record,
+                                                                    timings=timings)
+        except Exception as e:
+            if not network.is_transient(e):
+                raise
+            # Site fora do ar e nada no cache: o banco local tem o último resultado bom
+            opportunities = None
+            inserted = updated = 0
+            ctx.sources = [fapesp.SourceStatus(url, error=str(e) or type(e).__name__) for url in source_urls(conf)]
+            ctx.stale = "fapesp.br could not be reached; showing the stored opportunities."
+        else:
+            ctx.sources = sources
+            stale_pages = sum(status.stale for status in sources)
+            ctx.stale = (f"fapesp.br could not be reached; {stale_pages} listing page(s) came from the cache."
+                         if stale_pages else None)
+            timings.add("listing", items=len(opportunities))
+        timings.note("sources", [status.to_dict() for status in ctx.sources])
+        ctx.parse_memo.save()
+
+    if online and opportunities is not None:
+        # Só ids novos ou alterados são gravados; com uma fonte fora do ar, uma
+        # página que falhou ou lida do cache, a listagem pode estar incompleta e
+        # nada é marcado como encerrado
+        stage("Synchronizing", 60, "sync")
+        complete = all(status.complete for status in ctx.sources)
+        inserted, updated = ctx.store.sync(opportunities, complete=complete)
+        timings.add("sync", items=inserted + updated)
+
+    # Índice da busca local, refeito fora da thread da GUI e trocado de uma
+    # vez, de modo que a GUI o lê sem travas
+    if online and (inserted or updated or ctx.index is None):
+        stage("Indexing", 65, "index")
+        ctx.index = textindex.SearchIndex(ctx.store.search(include_expired=True, open_only=False))
+
+    stage("Filtering", 70, "filter")
+
+    ########
+    # "query", ou TITLE (OR) AND TITLE FILTERS (OR) AND BODY (OR), ordenado por prazo.
+    # O banco descarta o que a consulta já decide em SQL; o plano avalia o
+    # resto numa única passada e anota as palavras-chave encontradas
+    opportunities = ctx.store.search(where=query.where(unknown))
+    opportunities = query.filter(opportunities, unknown)
+
+    if conf["details-fetch"] and online:
+        stage("Fetching details", 80, "details")
+        ctx.detail_cache.max_age = conf["details-max-age"]
+        ctx.detail_failures = {}
+        details.fetch_details(opportunities,
+                              cache=ctx.detail_cache,
+                              max_workers=conf["details-workers"],
+                              rate=conf["details-rate"],
+                              failed=ctx.detail_failures)
+        # Editais que falharam ficam só com o texto da listagem
+        timings.note("details_failed", dict(ctx.detail_failures))
+    elif conf["details-fetch"]:
+        # Sem rede: usa apenas o que já está no cache
+        for op in opportunities:
+            op.add_detail(ctx.detail_cache.get(op.id))
+
+    if conf["details-fetch"]:
+        stage("Filtering", 90, "filter")
+        opportunities = query.filter(opportunities)
+
+    id_list = ctx.hidden.effective()
+
+    # id_list é o conjunto de números que queremos remover
+    lista_ordenada = [el for el in opportunities if el.id not in id_list]
+
+    timings.add("results", items=len(lista_ordenada))
+    stage("Done", 100)
+    return lista_ordenada
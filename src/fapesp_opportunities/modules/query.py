@@ -0,0 +1,377 @@
+"""
+Boolean queries over the fields of the opportunity records.
+
+    title:("Bolsa de PD" OR Doutorado) AND body:(neural OR visão) AND NOT institute:XYZ
+
+A term is a word or a "quoted phrase" and matches when it occurs in the field,
+ignoring case and accents. Terms without a field search the body. Adjacent
+terms are joined by AND; AND binds tighter than OR; NOT negates the next term
+or group. The operators must be written in upper case.
+"""
+import re
+from functools import lru_cache
+
+from fapesp_opportunities.modules.matcher import normalize_text, compile_matcher
+
+
+class QuerySyntaxError(ValueError):
+    """Raised when a query can not be parsed."""
+    pass
+
+
+# Campo -> (leitura do texto já normalizado, coluna normalizada no banco, custo relativo)
+FIELDS = {
+    "title": (lambda op: op.folded_title, "folded_title", 1),
+    "city": (lambda op: normalize_text(op.city), None, 1),
+    "institute": (lambda op: normalize_text(op.institute), None, 1),
+    "body": (lambda op: op.folded_text, "folded_text", 10),
+}
+ALIASES = {"text": "body", "cidade": "city", "instituicao": "institute", "titulo": "title"}
+DEFAULT_FIELD = "body"
+
+
+################################################################################
+# Plano de avaliação
+#
+# match(op, hits, unknown) devolve True, False ou None (campo em "unknown",
+# ainda não disponível); hits recebe as palavras-chave encontradas fora de NOT.
+
+class Keywords:
+    """
+    Matches when any of the keywords occurs in a field (one Aho-Corasick pass).
+    """
+    __slots__ = ("field", "keywords", "matcher", "read", "column", "cost")
+
+    def __init__(self, field, keywords):
+        self.field = field
+        self.keywords = tuple(dict.fromkeys(keywords))
+        self.matcher = compile_matcher(self.keywords)
+        self.read, self.column, self.cost = FIELDS[field]
+
+    def match(self, op, hits, unknown):
+        if self.field in unknown:
+            return None
+        if hits is None:
+            return self.matcher.matches(self.read(op), normalized=True)
+        found = self.matcher.search(self.read(op), normalized=True)
+        hits.extend(found)
+        return bool(found)
+
+    def sql(self, unknown):
+        if self.column is None or self.field in unknown:
+            return None
+        folded = sorted({normalize_text(k) for k in self.keywords})
+        clause = "(" + " OR ".join(f"instr({self.column}, ?) > 0" for _ in folded) + ")"
+        return clause, folded, True
+
+    def __repr__(self):
+        return f"{self.field}:{list(self.keywords)!r}"
+
+
+class And:
+    __slots__ = ("children", "cost")
+
+    def __init__(self, children):
+        # Predicados baratos primeiro; o primeiro False encerra a avaliação
+        self.children = sorted(children, key=lambda c: c.cost)
+        self.cost = sum(c.cost for c in self.children)
+
+    def match(self, op, hits, unknown):
+        # Só anota as palavras se a conjunção inteira não falhar
+        found = [] if hits is not None else None
+        result = True
+        for child in self.children:
+            value = child.match(op, found, unknown)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        if hits is not None:
+            hits.extend(found)
+        return result
+
+    def sql(self, unknown):
+        clauses, params, exact = [], [], True
+        for child in self.children:
+            pushed = child.sql(unknown)
+            if pushed is None:
+                exact = False
+                continue
+            clauses.append(pushed[0])
+            params.extend(pushed[1])
+            exact = exact and pushed[2]
+        if not clauses:
+            return None
+        return "(" + " AND ".join(clauses) + ")", params, exact
+
+    def __repr__(self):
+        return "(" + " AND ".join(map(repr, self.children)) + ")"
+
+
+class Or:
+    __slots__ = ("children", "cost")
+
+    def __init__(self, children):
+        # Termos do mesmo campo viram um único autômato
+        merged = {}
+        others = []
+        for child in children:
+            if isinstance(child, Keywords):
+                merged.setdefault(child.field, []).extend(child.keywords)
+            else:
+                others.append(child)
+        children = [Keywords(field, words) for field, words in merged.items()] + others
+        self.children = sorted(children, key=lambda c: c.cost)
+        self.cost = sum(c.cost for c in self.children)
+
+    def match(self, op, hits, unknown):
+        result = False
+        for child in self.children:
+            value = child.match(op, hits, unknown)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+
+    def sql(self, unknown):
+        clauses, params, exact = [], [], True
+        for child in self.children:
+            pushed = child.sql(unknown)
+            if pushed is None:
+                return None
+            clauses.append(pushed[0])
+            params.extend(pushed[1])
+            exact = exact and pushed[2]
+        return "(" + " OR ".join(clauses) + ")", params, exact
+
+    def __repr__(self):
+        return "(" + " OR ".join(map(repr, self.children)) + ")"
+
+
+class Not:
+    __slots__ = ("child", "cost")
+
+    def __init__(self, child):
+        self.child = child
+        self.cost = child.cost
+
+    def match(self, op, hits, unknown):
+        # Palavras encontradas dentro de NOT não são anotadas
+        value = self.child.match(op, None, unknown)
+        return None if value is None else not value
+
+    def sql(self, unknown):
+        pushed = self.child.sql(unknown)
+        if pushed is None or not pushed[2]:
+            return None
+        return f"NOT {pushed[0]}", pushed[1], True
+
+    def __repr__(self):
+        return f"NOT {self.child!r}"
+
+
+def _and(children):
+    flat = []
+    for child in children:
+        flat.extend(child.children if isinstance(child, And) else [child])
+    return flat[0] if len(flat) == 1 else And(flat)
+
+
+def _or(children):
+    flat = []
+    for child in children:
+        flat.extend(child.children if isinstance(child, Or) else [child])
+    if len(flat) == 1:
+        return flat[0]
+    node = Or(flat)
+    return node.children[0] if len(node.children) == 1 else node
+
+
+################################################################################
+# Parser
+
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()":]+):|([^\s()"]+))')
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if m is None:
+            raise QuerySyntaxError(f"unexpected {text[pos:].strip()[:20]!r} at position {pos}")
+        lparen, rparen, quoted, field, word = m.groups()
+        if lparen:
+            tokens.append(("(", None))
+        elif rparen:
+            tokens.append((")", None))
+        elif quoted is not None:
+            tokens.append(("term", quoted))
+        elif field is not None:
+            name = ALIASES.get(field.lower(), field.lower())
+            if name not in FIELDS:
+                raise QuerySyntaxError(f"unknown field {field!r}; use one of {', '.join(FIELDS)}")
+            tokens.append(("field", name))
+        elif word in ("AND", "OR", "NOT"):
+            tokens.append((word, None))
+        else:
+            tokens.append(("term", word))
+        pos = m.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self, kind=None):
+        if kind is not None and self.peek() != kind:
+            raise QuerySyntaxError(f"expected {kind!r} but found {self.peek() or 'the end'!r}")
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.parse_or(DEFAULT_FIELD)
+        if self.peek() is not None:
+            raise QuerySyntaxError(f"unexpected {self.peek()!r}")
+        return node
+
+    def parse_or(self, field):
+        children = [self.parse_and(field)]
+        while self.peek() == "OR":
+            self.take()
+            children.append(self.parse_and(field))
+        return _or(children)
+
+    def parse_and(self, field):
+        children = [self.parse_not(field)]
+        while self.peek() in ("AND", "NOT", "term", "field", "("):
+            if self.peek() == "AND":
+                self.take()
+            children.append(self.parse_not(field))
+        return _and(children)
+
+    def parse_not(self, field):
+        if self.peek() == "NOT":
+            self.take()
+            return Not(self.parse_not(field))
+        return self.parse_atom(field)
+
+    def parse_atom(self, field):
+        kind = self.peek()
+        if kind == "field":
+            return self.parse_atom(self.take()[1])
+        if kind == "(":
+            self.take()
+            node = self.parse_or(field)
+            self.take(")")
+            return node
+        if kind == "term":
+            term = self.take()[1]
+            if not normalize_text(term).strip():
+                raise QuerySyntaxError("empty term")
+            return Keywords(field, [term])
+        raise QuerySyntaxError(f"expected a term but found {kind or 'the end'!r}")
+
+
+################################################################################
+
+class Query:
+    """
+    A compiled query.
+
+    The plan checks the cheap fields (title, city, institute) before the full
+    text, stops at the first clause that decides the result, and scans each
+    field once per group of OR-ed terms. An empty query matches every record.
+    """
+    def __init__(self, root=None, text=""):
+        self.root = root
+        self.text = text
+
+    def matches(self, op, hits=None, unknown=()):
+        """
+        Evaluates the query on a record.
+
+        Parameters:
+            op (Opportunity): The record.
+            hits (list): Optional list that receives the keywords found.
+            unknown (tuple): Fields not available yet; clauses on them are undecided.
+
+        Returns:
+            True, False, or None when the result depends on an unknown field.
+        """
+        if self.root is None:
+            return True
+        return self.root.match(op, hits, unknown)
+
+    def filter(self, opportunities, unknown=()):
+        """
+        Returns the records that match (or may match, for unknown fields),
+        with the keywords found added to their hits.
+        """
+        if self.root is None:
+            return list(opportunities)
+        result = []
+        for op in opportunities:
+            hits = []
+            if self.root.match(op, hits, unknown) is not False:
+                op.add_hits(hits)
+                result.append(op)
+        return result
+
+    def where(self, unknown=()):
+        """
+        Translates the query to an SQLite condition on the store columns.
+
+        Clauses on fields without a folded column (or unknown) are left out, so
+        the condition may let more rows through than the query; filter() must
+        still run on the result.
+
+        Returns:
+            tuple: (sql, params), or None if nothing can be translated.
+        """
+        pushed = self.root.sql(unknown) if self.root is not None else None
+        return None if pushed is None else pushed[:2]
+
+    def __bool__(self):
+        return self.root is not None
+
+    def __repr__(self):
+        return f"Query({self.root!r})"
+
+
+@lru_cache(maxsize=32)
+def compile_query(text):
+    """
+    Parses and compiles a query; the result is cached by text.
+
+    Raises:
+        QuerySyntaxError: If the query is malformed.
+    """
+    tokens = _tokenize(text)
+    if not tokens:
+        return Query(None, text)
+    return Query(_Parser(tokens).parse(), text)
+
+
+def query_from_keywords(title_contents=(), title_filters=(), body_contents=()):
+    """
+    Builds the query equivalent to the keyword lists of the configuration:
+    title-contents (OR) AND title-contents-filters (OR) AND body-contents (OR).
+    Empty lists are ignored.
+    """
+    groups = []
+    for field, words in (("title", title_contents), ("title", title_filters), ("body", body_contents)):
+        words = [w for w in words if normalize_text(w).strip()]
+        if words:
+            groups.append(Keywords(field, words))
+    if not groups:
+        return Query(None)
+    return Query(_and(groups))
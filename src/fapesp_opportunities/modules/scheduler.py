@@ -0,0 +1,113 @@
+import random
+from datetime import date
+
+# Prazo a menos destes dias deixa o intervalo mais curto
+NEAR_DEADLINE_DAYS = 3
+
+
+class RefreshPolicy:
+    """
+    Decides how long to wait before the next background refresh.
+
+    After each refresh, record() receives its outcome and returns the next interval
+    (a refresh that ended without an outcome, e.g. cancelled, uses pending()):
+
+    * failure: the interval doubles with every consecutive failure (exponential
+      backoff), up to max_interval;
+    * new items: the next refresh comes after min_interval;
+    * unchanged listing: the interval grows by growth with every refresh in a
+      row that brought nothing new, up to max_interval;
+    * a matching opportunity whose deadline is near halves the interval.
+
+    A small random jitter keeps several instances from refreshing in lockstep.
+
+    Parameters:
+        interval (float): Base interval in seconds.
+        min_interval (float): Shortest interval in seconds.
+        max_interval (float): Longest interval in seconds.
+        growth (float): Factor applied per unchanged refresh.
+        jitter (float): Fraction of random variation of each interval.
+    """
+    def __init__(self, interval=1800, min_interval=600, max_interval=6 * 3600, growth=1.5, jitter=0.1):
+        self.interval = interval
+        self.min_interval = min(min_interval, interval)
+        self.max_interval = max(max_interval, interval)
+        self.growth = growth
+        self.jitter = jitter
+        self.failures = 0
+        self.unchanged = 0
+
+    def _clamp(self, seconds):
+        return max(self.min_interval, min(self.max_interval, seconds))
+
+    def record(self, ok, new_items=0, nearest_deadline=None, today=None):
+        """
+        Registers the outcome of a refresh and returns the seconds until the next one.
+
+        Parameters:
+            ok (bool): Whether the refresh succeeded.
+            new_items (int): Matching opportunities not seen before.
+            nearest_deadline (int): Smallest deadline ordinal among the results, if any.
+            today (int): Date ordinal of today. Default is date.today().
+
+        Returns:
+            float: Seconds to wait.
+        """
+        if not ok:
+            self.failures += 1
+        else:
+            self.failures = 0
+            if new_items:
+                self.unchanged = 0
+            else:
+                self.unchanged += 1
+        return self.pending(nearest_deadline, today, new_items=ok and new_items)
+
+    def pending(self, nearest_deadline=None, today=None, new_items=False):
+        """
+        Returns the seconds until the next refresh without registering an outcome.
+
+        Parameters:
+            nearest_deadline (int): Smallest deadline ordinal among the results, if any.
+            today (int): Date ordinal of today. Default is date.today().
+            new_items (bool): Whether the last refresh brought new items.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        if self.failures:
+            seconds = self.interval * 2 ** self.failures
+        else:
+            if new_items:
+                seconds = self.min_interval
+            else:
+                seconds = self.interval * self.growth ** max(0, self.unchanged - 1)
+
+            today = today if today is not None else date.today().toordinal()
+            if nearest_deadline is not None and nearest_deadline - today <= NEAR_DEADLINE_DAYS:
+                seconds /= 2
+
+        seconds = self._clamp(seconds)
+        return seconds * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+class NewItemTracker:
+    """
+    Remembers the ids of the opportunities already reported.
+
+    The first call to update() only sets the baseline; the following calls
+    return the records whose id was never seen before.
+    """
+    def __init__(self, ids=None):
+        self.known = set(ids) if ids is not None else None
+
+    def update(self, opportunities):
+        """
+        Returns the records of opportunities with unseen ids and remembers them.
+        """
+        if self.known is None:
+            self.known = {op.id for op in opportunities}
+            return []
+        new = [op for op in opportunities if op.id not in self.known]
+        self.known.update(op.id for op in new)
+        return new
@@ -0,0 +1,52 @@
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """
+    Records how long each startup phase takes.
+
+    Phases are measured with the phase() context manager or closed with mark();
+    report() prints the breakdown. A disabled profiler records nothing.
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self._last = self.origin
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.phases.append((name, end - start))
+            self._last = end
+
+    def mark(self, name):
+        """
+        Records the time elapsed since the previous phase ended as a phase called name.
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def report(self, out=None):
+        if not self.enabled:
+            return
+        out = out or sys.stderr
+        width = max([len(name) for name, _ in self.phases] + [5])
+        out.write("Startup profile:\n")
+        for name, seconds in self.phases:
+            out.write(f"  {name:<{width}}  {seconds * 1000:9.1f} ms\n")
+        total = time.perf_counter() - self.origin
+        out.write(f"  {'total':<{width}}  {total * 1000:9.1f} ms\n")
+        out.flush()
@@ -0,0 +1,196 @@
+import time
+import sqlite3
+import threading
+from datetime import date
+
+from fapesp_opportunities.modules.fapesp import Opportunity
+from fapesp_opportunities.modules.matcher import normalize_text
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS opportunities (
+    id           INTEGER PRIMARY KEY,
+    title        TEXT NOT NULL,
+    body         TEXT NOT NULL,
+    text         TEXT NOT NULL,
+    link         TEXT NOT NULL,
+    city         TEXT NOT NULL,
+    institute    TEXT NOT NULL,
+    end_date     TEXT NOT NULL,
+    deadline     INTEGER NOT NULL,
+    folded_title TEXT NOT NULL,
+    folded_text  TEXT NOT NULL,
+    is_open      INTEGER NOT NULL DEFAULT 1,
+    first_seen   REAL NOT NULL,
+    last_seen    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_opportunities_open_deadline
+    ON opportunities (is_open, deadline);
+"""
+
+_COLUMNS = "title, body, text, link, id, city, institute, end_date, deadline"
+
+
+class OpportunityStore:
+    """
+    SQLite store of parsed opportunities, keyed by the opportunity id.
+
+    sync() inserts the ids never seen before, updates the rows whose deadline or
+    body changed and marks as closed the ids that left the listing. search()
+    answers the configured filters with a query ordered by the deadline index,
+    so results are available at startup before any network access.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    ############################################################################
+    def known(self):
+        """
+        Returns a dict {id: (deadline, body)} of every stored opportunity.
+        """
+        with self._lock:
+            return self._known()
+
+    def _known(self):
+        rows = self._conn.execute("SELECT id, deadline, body FROM opportunities")
+        return {r[0]: (r[1], r[2]) for r in rows}
+
+    def _upsert(self, records, known, now):
+        inserted = updated = 0
+        for op in records:
+            row = (op.title, op.body, op.text, op.link, op.city, op.institute,
+                   op.end_date, op.deadline, op.folded_title, op.folded_text)
+            if op.id not in known:
+                self._conn.execute(
+                    "INSERT INTO opportunities (title, body, text, link, city, institute, end_date, "
+                    "deadline, folded_title, folded_text, id, is_open, first_seen, last_seen) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?)",
+                    row + (op.id, now, now))
+                inserted += 1
+            elif known[op.id][0] != op.deadline or known[op.id][1] != op.body:
+                self._conn.execute(
+                    "UPDATE opportunities SET title = ?, body = ?, text = ?, link = ?, city = ?, "
+                    "institute = ?, end_date = ?, deadline = ?, folded_title = ?, folded_text = ?, "
+                    "is_open = 1, last_seen = ? WHERE id = ?",
+                    row + (now, op.id))
+                updated += 1
+        return inserted, updated
+
+    def _mark(self, ids, complete, now):
+        self._conn.executemany(
+            "UPDATE opportunities SET is_open = 1, last_seen = ? WHERE id = ?",
+            [(now, i) for i in ids])
+        if complete:
+            self._conn.execute(
+                "UPDATE opportunities SET is_open = 0 WHERE last_seen < ?", (now,))
+
+    def sync(self, records, complete=True):
+        """
+        Stores already parsed records, writing only new or changed rows.
+
+        Parameters:
+            records (list): Opportunity records of the current listing.
+            complete (bool): True if records is the whole listing; ids missing
+                             from it are then marked as closed.
+
+        Returns:
+            tuple: (inserted, updated) row counts.
+        """
+        now = time.time()
+        with self._lock:
+            # Leitura e escrita na mesma transação: outro sync (ou processo) não
+            # pode inserir entre elas e fazer o INSERT de um id novo falhar
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                counts = self._upsert(records, self._known(), now)
+                self._mark([op.id for op in records], complete, now)
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+        return counts
+
+    ############################################################################
+    def search(self, title_groups=(), body_contents=(), include_expired=False, open_only=True, where=None):
+        """
+        Returns the stored opportunities that match the keyword filters, ordered by deadline.
+
+        Parameters:
+            title_groups (list): Keyword lists; the title must contain a keyword of every list.
+            body_contents (list): The full text must contain one of these keywords.
+            include_expired (bool): If False, opportunities past their deadline are skipped.
+            open_only (bool): If True, only ids present in the last complete sync are returned.
+            where (tuple): Optional extra (sql, params) condition, e.g. from Query.where().
+
+        Returns:
+            list: Opportunity records ordered by deadline.
+        """
+        extra = where
+        where = []
+        params = []
+        if open_only:
+            where.append("is_open = 1")
+        if not include_expired:
+            where.append("deadline >= ?")
+            params.append(date.today().toordinal())
+
+        groups = [(g, "folded_title") for g in title_groups] + [(body_contents, "folded_text")]
+        for keywords, column in groups:
+            folded = sorted({normalize_text(k) for k in keywords if k})
+            if not folded:
+                continue
+            where.append("(" + " OR ".join(f"instr({column}, ?) > 0" for _ in folded) + ")")
+            params.extend(folded)
+
+        if extra is not None:
+            where.append(extra[0])
+            params.extend(extra[1])
+
+        sql = f"SELECT {_COLUMNS} FROM opportunities"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY deadline, id"
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [Opportunity.load(r) for r in rows]
+
+    def expired_ids(self, ids, today=None):
+        """
+        Returns which of the given ids have a deadline before today.
+
+        Parameters:
+            ids (iterable): Opportunity ids.
+            today (int): Date ordinal used as today. Default is date.today().
+
+        Returns:
+            set: The expired ids; unknown ids are never reported.
+        """
+        today = today if today is not None else date.today().toordinal()
+        ids = list(ids)
+        expired = set()
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                marks = ", ".join("?" for _ in chunk)
+                rows = self._conn.execute(
+                    f"SELECT id FROM opportunities WHERE deadline < ? AND id IN ({marks})",
+                    [today] + chunk)
+                expired.update(r[0] for r in rows)
+        return expired
+
+    def get(self, id_number):
+        """
+        Returns the stored record of an id, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM opportunities WHERE id = ?", (id_number,)).fetchone()
+        return Opportunity.load(row) if row else None
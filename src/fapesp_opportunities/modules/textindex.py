@@ -0,0 +1,136 @@
+import re
+import math
+from bisect import bisect_left
+
+from fapesp_opportunities.modules.matcher import normalize_text
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Campo -> peso na frequência dos termos
+FIELD_WEIGHTS = (
+    ("title", 3.0),
+    ("institute", 2.0),
+    ("city", 2.0),
+    ("text", 1.0),
+)
+
+MAX_PREFIX_TERMS = 64
+
+
+def tokenize(text):
+    """
+    Splits a text into accent and case insensitive word tokens.
+    """
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+class SearchIndex:
+    """
+    In-memory inverted index of opportunity records ranked with BM25.
+
+    The title, institute, city and full text of each record are tokenized once;
+    their term frequencies are combined with FIELD_WEIGHTS (a BM25F-like
+    weighting), so a word in the title counts more than the same word in the
+    text. Queries only touch the postings of their terms.
+
+    Parameters:
+        records (list): Opportunity records to index.
+        k1 (float): BM25 term frequency saturation.
+        b (float): BM25 length normalization.
+    """
+    def __init__(self, records, k1=1.2, b=0.75):
+        self.records = list(records)
+        self.k1 = k1
+        self.postings = {}
+
+        lengths = []
+        for doc, op in enumerate(self.records):
+            freqs = {}
+            length = 0.0
+            for field, weight in FIELD_WEIGHTS:
+                for term in tokenize(getattr(op, field)):
+                    freqs[term] = freqs.get(term, 0.0) + weight
+                    length += weight
+            for term, tf in freqs.items():
+                self.postings.setdefault(term, {})[doc] = tf
+            lengths.append(length)
+
+        avgdl = (sum(lengths) / len(lengths)) if lengths else 1.0
+        # Parte da normalização por tamanho que não depende do termo
+        self._norm = [k1 * (1 - b + b * dl / (avgdl or 1.0)) for dl in lengths]
+        n = len(self.records)
+        self._idf = {term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+                     for term, docs in self.postings.items()}
+        self._vocabulary = sorted(self.postings)
+
+    def __len__(self):
+        return len(self.records)
+
+    def _expand(self, prefix):
+        # Termos do vocabulário que começam com o prefixo
+        start = bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:start + MAX_PREFIX_TERMS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def _scores(self, terms):
+        # Soma BM25 dos termos (variações de um mesmo token da consulta)
+        scores = {}
+        k1 = self.k1
+        norm = self._norm
+        for term in terms:
+            idf = self._idf[term]
+            for doc, tf in self.postings[term].items():
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (k1 + 1) / (tf + norm[doc])
+        return scores
+
+    def search(self, text, limit=100, exclude=(), prefix=True):
+        """
+        Finds the records that contain every word of a query, best first.
+
+        Parameters:
+            text (str): The query, e.g. "remote sensing".
+            limit (int): Maximum number of results; None for all.
+            exclude (set): Ids left out of the results.
+            prefix (bool): If True the last word also matches longer words
+                           ("sens" finds "sensing"), unless the text ends with a space.
+
+        Returns:
+            list: (score, record, matched terms) tuples ordered by decreasing score.
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        expand_last = prefix and not text[-1:].isspace()
+
+        per_token = []
+        for token in dict.fromkeys(tokens):
+            if expand_last and token == tokens[-1]:
+                terms = self._expand(token)
+            else:
+                terms = [token] if token in self.postings else []
+            if not terms:
+                return []
+            per_token.append((terms, self._scores(terms)))
+
+        # Todas as palavras são exigidas; começa pelo token mais seletivo
+        per_token.sort(key=lambda item: len(item[1]))
+        total = dict(per_token[0][1])
+        for _, scores in per_token[1:]:
+            total = {doc: s + scores[doc] for doc, s in total.items() if doc in scores}
+            if not total:
+                return []
+
+        ranked = sorted((doc for doc in total if self.records[doc].id not in exclude),
+                        key=lambda d: (-total[d], self.records[d].deadline, self.records[d].id))
+        if limit is not None:
+            ranked = ranked[:limit]
+
+        results = []
+        for doc in ranked:
+            matched = tuple(t for terms, _ in per_token for t in terms if doc in self.postings[t])
+            results.append((total[doc], self.records[doc], matched))
+        return results
@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+import fapesp_opportunities.about as about
+
+logger = logging.getLogger(about.__package__ + ".timing")
+
+
+class SearchTimings:
+    """
+    Durations, item counts and bytes of the stages of one search.
+
+    Each stage accumulates the seconds spent in it, how many times it ran,
+    the items it produced and the bytes it transferred. Stages measured inside
+    worker threads add up their durations, so they can exceed the wall time of
+    the stage that contains them. The object is thread safe and costs two
+    perf_counter() calls per measurement.
+    """
+    def __init__(self):
+        self.started = time.time()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.notes = {}
+
+    def add(self, name, seconds=0.0, items=0, nbytes=0):
+        """
+        Adds a measurement to a stage, creating it on first use.
+        """
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = {"seconds": 0.0, "calls": 0, "items": 0, "bytes": 0}
+            stage["seconds"] += seconds
+            stage["calls"] += 1
+            stage["items"] += items
+            stage["bytes"] += nbytes
+
+    def note(self, key, value):
+        """
+        Attaches extra JSON-serializable information to the record, e.g. the status of each source.
+        """
+        with self._lock:
+            self.notes[key] = value
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Measures the block as a stage; the yielded dict may receive "items" and "bytes".
+        """
+        extra = {"items": 0, "bytes": 0}
+        start = time.perf_counter()
+        try:
+            yield extra
+        finally:
+            self.add(name, time.perf_counter() - start, extra["items"], extra["bytes"])
+
+    @property
+    def total(self):
+        return time.perf_counter() - self._origin
+
+    def to_dict(self):
+        with self._lock:
+            stages = {name: dict(stage) for name, stage in self.stages.items()}
+            record = {"started": self.started, "total": self.total, "stages": stages}
+            record.update(self.notes)
+        return record
+
+    def summary(self, names=None):
+        """
+        Returns a one-line text with the seconds of the given stages (default: all).
+        """
+        with self._lock:
+            names = [n for n in (names or self.stages) if n in self.stages]
+            parts = [f"{n} {self.stages[n]['seconds']:.2f} s" for n in names]
+        return " · ".join(parts)
+
+    def details(self):
+        """
+        Returns a multi-line table with every stage.
+        """
+        lines = [f"{'stage':<14}{'seconds':>9}{'calls':>7}{'items':>8}{'KiB':>9}"]
+        with self._lock:
+            for name, s in self.stages.items():
+                lines.append(f"{name:<14}{s['seconds']:>9.3f}{s['calls']:>7}{s['items']:>8}{s['bytes'] / 1024:>9.1f}")
+        lines.append(f"{'total':<14}{self.total:>9.3f}")
+        for source in self.notes.get("sources", ()):
+            state = "ok" if source["error"] is None else f"failed: {source['error']}"
+            lines.append(f"{source['url']}  {source['items']} items  {source['seconds']:.2f} s  {state}")
+            for url, error in source.get("failed_pages", {}).items():
+                lines.append(f"  {url}  failed: {error}")
+        for url, error in self.notes.get("details_failed", {}).items():
+            lines.append(f"{url}  details failed: {error}")
+        return "\n".join(lines)
+
+
+def log_timings(timings, **fields):
+    """
+    Emits the timings of a search as one JSON line on the timing logger.
+
+    Parameters:
+        timings (SearchTimings): The measurements.
+        fields: Extra keys of the line, e.g. the number of results.
+    """
+    if logger.isEnabledFor(logging.INFO):
+        record = timings.to_dict()
+        record.update(fields)
+        logger.info(json.dumps(record, ensure_ascii=False))
+
+
+_log_target = None
+
+
+def enable_log(target):
+    """
+    Sends the timing lines to a file (appended), to stderr ("-"), or nowhere ("").
+
+    Calling it again with the same target does nothing.
+    """
+    global _log_target
+    if target == _log_target:
+        return
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    _log_target = target
+    if not target:
+        logger.setLevel(logging.WARNING)
+        return
+
+    if target == "-":
+        handler = logging.StreamHandler()
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+        handler = logging.FileHandler(target, encoding='utf-8')
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
@@ -0,0 +1,70 @@
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+from fapesp_opportunities.modules.pipeline import SearchCancelled
+
+
+class WorkerSignals(QObject):
+    """
+    Signals sent by a SearchWorker; every signal carries the generation of the
+    search so the receiver can drop results of stale searches.
+    """
+    progress = pyqtSignal(int, str, int)    # generation, stage, percent
+    partial = pyqtSignal(int, object)       # generation, results found so far
+    finished = pyqtSignal(int, object)      # generation, results
+    failed = pyqtSignal(int, str)           # generation, error message
+    cancelled = pyqtSignal(int)             # generation
+
+
+class SearchWorker(QRunnable):
+    """
+    Runs a search function in a QThreadPool thread.
+
+    The function is called as func(*args, **kwargs, progress=..., is_cancelled=..., partial=...):
+    progress(stage, percent) and partial(results) are forwarded through the
+    signals and is_cancelled() becomes True after cancel(), so the function can
+    stop between stages by raising SearchCancelled.
+    """
+    def __init__(self, generation, func, *args, **kwargs):
+        super().__init__()
+        self.generation = generation
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_cancelled(self):
+        return self._cancel.is_set()
+
+    def _progress(self, stage, percent):
+        if not self.is_cancelled():
+            self.signals.progress.emit(self.generation, stage, percent)
+
+    def _partial(self, results):
+        if not self.is_cancelled():
+            self.signals.partial.emit(self.generation, results)
+
+    def run(self):
+        try:
+            results = self.func(*self.args,
+                                **self.kwargs,
+                                progress=self._progress,
+                                is_cancelled=self.is_cancelled,
+                                partial=self._partial)
+        except SearchCancelled:
+            self.signals.cancelled.emit(self.generation)
+        except Exception as e:
+            if self.is_cancelled():
+                self.signals.cancelled.emit(self.generation)
+            else:
+                self.signals.failed.emit(self.generation, str(e))
+        else:
+            if self.is_cancelled():
+                self.signals.cancelled.emit(self.generation)
+            else:
+                self.signals.finished.emit(self.generation, results)
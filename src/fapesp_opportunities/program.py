@@ -1,82 +1,58 @@
 import os
 import json
 import sys
+import html
+import time
 import signal
+import logging
+import threading
 import subprocess
-from datetime import datetime
+from datetime import date
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QMessageBox, QMenu, 
-    QLineEdit, QTextEdit, QLabel, QScrollArea, QFrame, QMainWindow, QAction, QToolBar
+    QLineEdit, QLabel, QMainWindow, QAction, QToolBar, QSystemTrayIcon, QComboBox
 )
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QIcon
+from PyQt5.QtGui import QIcon, QKeySequence
 from PyQt5.QtGui import QDesktopServices, QTextOption
 from PyQt5.QtWidgets import QSizePolicy
 from PyQt5.QtGui import QDesktopServices
-from PyQt5.QtCore import QUrl, QTimer
+from PyQt5.QtCore import QUrl, QTimer, QThreadPool, QFileSystemWatcher, pyqtSignal
 
-import fapesp_opportunities.modules.configure as configure 
 import fapesp_opportunities.modules.fapesp as fapesp
+import fapesp_opportunities.modules.pipeline as pipeline
+import fapesp_opportunities.modules.timing as timing
+import fapesp_opportunities.modules.scheduler as scheduler
+import fapesp_opportunities.modules.deadlines as deadlines
 import fapesp_opportunities.about as about
 
 from fapesp_opportunities.desktop import create_desktop_file
 from fapesp_opportunities.desktop import create_desktop_directory
 from fapesp_opportunities.desktop import create_desktop_menu
-from fapesp_opportunities.modules.wabout    import show_about_window
 from fapesp_opportunities.modules.resources import resource_path
+from fapesp_opportunities.modules.pipeline import buscar_oportunidades
+from fapesp_opportunities.modules.worker import SearchWorker
+from fapesp_opportunities.modules.cardview import OpportunityModel, CardDelegate, CardListView, OpportunityRole
+from fapesp_opportunities.modules.startup import StartupProfiler
 
 # Caminho para o arquivo de configuração
-CONFIG_PATH = os.path.join(os.path.expanduser("~"),
-                            ".config",
-                            about.__package__,
-                            "config.json")
-configure.verify_default_config(CONFIG_PATH)
+CONFIG_PATH = pipeline.CONFIG_PATH
 
-
-
-# Função simulada que retornaria os dicionários com base em CONF
-def buscar_oportunidades(config_path):
-    conf = configure.load_config(config_path)
-    
-    opportunities = fapesp.get_open_opportunities(url=conf["url"])
-    
-    ########
-    # TITLE 
-    opportunities = fapesp.filter_grants_by_title(opportunities, conf["title-contents"]) #OR
-    #for el in opportunities:
-    #    print(">>>")
-    #    print(el)
-    # AND
-    opportunities = fapesp.filter_grants_by_title(opportunities, conf["title-contents-filters"]) #OR
-    
-    # AND
-    
-    ########
-    # BODY
-    opportunities = fapesp.filter_grants_by_content(opportunities, conf["body-contents"])
-
-    
-    ########
-    # FINAL
-    total_list = fapesp.parse_opportunities(opportunities, base_url="https://fapesp.br")
-    
-    lista_ordenada = sorted(
-        total_list,
-        key=lambda d: datetime.strptime(d["end-date"], "%d/%m/%Y") if d.get("end-date") else datetime.max
-    )
-    
-    id_list = conf["avoid_ids"]
-
-    # id_list é a lista de números que queremos remover
-    lista_ordenada = [el for el in lista_ordenada if el.get("id") not in id_list]
-    
-    return lista_ordenada
+logger = logging.getLogger(about.__package__)
 
 # Widget principal
 class FapespGUI(QMainWindow):
+    # Erro da compactação dos ids ocultos, emitido pela thread que a executa
+    compact_failed = pyqtSignal(str)
+    # Chaves alteradas da configuração; o ConfigService avisa de qualquer thread
+    config_changed = pyqtSignal(list)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle(about.__program_name__)
+        
+        # Configuração, banco local, caches e ids ocultados
+        self.ctx = pipeline.get_context(CONFIG_PATH)
         self.setMinimumSize(600, 400)
 
         ## Icon
@@ -109,24 +85,108 @@ class FapespGUI(QMainWindow):
         self.layout.addLayout(linha_caminho)
 
         
-        # Botão para buscar oportunidades
+        # Botões para buscar oportunidades e cancelar a busca
+        linha_busca = QHBoxLayout()
+        
         self.btn_buscar = QPushButton("Search")
         self.btn_buscar.clicked.connect(self.buscar)
-        self.layout.addWidget(self.btn_buscar)
-
-        # Área de rolagem para mostrar resultados
-        self.result_area = QScrollArea()
-        self.result_area.setWidgetResizable(True)
-        self.result_widget = QWidget()
-        self.result_layout = QVBoxLayout()
-        self.result_widget.setLayout(self.result_layout)
-        self.result_area.setWidget(self.result_widget)
-        self.layout.addWidget(self.result_area)
+        linha_busca.addWidget(self.btn_buscar)
+        
+        self.btn_cancelar = QPushButton("Cancel")
+        self.btn_cancelar.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Fixed)
+        self.btn_cancelar.setEnabled(False)
+        self.btn_cancelar.clicked.connect(self.cancelar)
+        linha_busca.addWidget(self.btn_cancelar)
+        
+        self.layout.addLayout(linha_busca)
+
+        # Busca local enquanto se digita, sobre o índice em memória
+        linha_filtro = QHBoxLayout()
+        self.filtro_local = QLineEdit()
+        self.filtro_local.setPlaceholderText("Search title, text, city or institute...")
+        self.filtro_local.setClearButtonEnabled(True)
+        self.filtro_local.textChanged.connect(lambda _: self.filtro_timer.start())
+        linha_filtro.addWidget(self.filtro_local)
+
+        # Janela de prazo, respondida pelo índice ordenado por prazo
+        self.janela_prazo = QComboBox()
+        for texto, dias in (("Any deadline", None), ("Closing in 7 days", 7), ("Closing in 30 days", 30)):
+            self.janela_prazo.addItem(texto, dias)
+        self.janela_prazo.currentIndexChanged.connect(lambda _: self.filtrar_local())
+        linha_filtro.addWidget(self.janela_prazo)
+        self.layout.addLayout(linha_filtro)
+
+        self.filtro_timer = QTimer(self)
+        self.filtro_timer.setSingleShot(True)
+        self.filtro_timer.setInterval(150)
+        self.filtro_timer.timeout.connect(self.filtrar_local)
+
+        # Lista virtualizada: os cartões são pintados pelo delegate
+        self.result_model = OpportunityModel(self)
+        self.result_delegate = CardDelegate(self)
+        self.result_delegate.menu_requested.connect(self.mostrar_menu)
+        self.result_view = CardListView()
+        self.result_view.setModel(self.result_model)
+        self.result_view.setItemDelegate(self.result_delegate)
+        self.result_view.customContextMenuRequested.connect(self.on_context_menu)
+        self.layout.addWidget(self.result_view)
     
         # Adiciona a toolbar
         self.create_toolbar()
+
+        # Tempo das etapas da última busca; a dica mostra a tabela completa
+        self.timing_label = QLabel()
+        self.statusBar().addPermanentWidget(self.timing_label)
         
-        self.buscar()
+        # Busca em segundo plano; só o resultado da última geração é mostrado
+        self.thread_pool = QThreadPool.globalInstance()
+        self.search_generation = 0
+        self.workers = {}
+        # Resultado dos filtros, mantido em ordem de prazo
+        self.prazos = deadlines.DeadlineIndex()
+        
+        # Lotes ocultados, para desfazer; a compactação do diário espera um pouco
+        self.hidden_batches = []
+        self.compact_timer = QTimer(self)
+        self.compact_timer.setSingleShot(True)
+        self.compact_timer.setInterval(5000)
+        self.compact_timer.timeout.connect(self.compactar_ocultos)
+        self.compact_failed.connect(self.on_compact_failed)
+        self.compact_timer.start()
+        
+        # O arquivo de configuração é editado fora do programa ("Open")
+        self.config_watcher = QFileSystemWatcher([CONFIG_PATH], self)
+        self.config_watcher.fileChanged.connect(self.on_config_changed)
+        self.config_changed.connect(self.on_config_reloaded)
+        self.ctx.config.add_listener(lambda service, changed: self.config_changed.emit(sorted(changed)))
+        
+        # Atualização periódica em segundo plano; o intervalo se adapta ao resultado
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.timeout.connect(self.atualizar)
+        self.refresh_policy = self.criar_politica()
+        self.auto_generations = set()
+
+        # Avisos de oportunidades novas na bandeja do sistema
+        self.tray = QSystemTrayIcon(QIcon(self.icon_path), self)
+        self.tray.setToolTip(about.__program_name__)
+        self.tray.activated.connect(self.restaurar_janela)
+        self.tray.messageClicked.connect(self.restaurar_janela)
+        if QSystemTrayIcon.isSystemTrayAvailable():
+            self.tray.show()
+
+        # Mostra o que já está no banco local antes de ir à rede
+        try:
+            stored = buscar_oportunidades(CONFIG_PATH, online=False)
+        except Exception as e:
+            # A busca pela rede, logo a seguir, mostra o erro se ele persistir
+            stored = []
+            self.statusBar().showMessage(f"Could not read the stored opportunities: {e}")
+        self.novos = scheduler.NewItemTracker(el.id for el in stored)
+        self.mostrar_resultados(stored)
+        if self.ctx.config.query_error:
+            self.statusBar().showMessage(self.aviso_consulta())
+        QTimer.singleShot(0, self.buscar)
 
 
     def create_toolbar(self):
@@ -151,6 +211,14 @@ class FapespGUI(QMainWindow):
         oport_action.triggered.connect(self.open_oportunities)
         oport_action.setToolTip("Open the FAPESP site with oportunities.")
         toolbar.addAction(oport_action)
+        
+        # 
+        self.undo_action = QAction("Undo hide", self)
+        self.undo_action.setShortcut(QKeySequence.Undo)
+        self.undo_action.triggered.connect(self.undo_hide)
+        self.undo_action.setToolTip("Show again the last hidden opportunities.")
+        self.undo_action.setEnabled(False)
+        toolbar.addAction(self.undo_action)
 
     ############################################################################
     def on_coffee_action_click(self):
@@ -158,8 +226,9 @@ class FapespGUI(QMainWindow):
     
     ############################################################################
     def open_oportunities(self):
-        conf = configure.load_config(CONFIG_PATH)
-        QDesktopServices.openUrl(QUrl(conf["url"]))
+        # "url" pode ser uma lista de fontes; abre cada uma
+        for url in pipeline.source_urls(self.ctx.config.snapshot()):
+            QDesktopServices.openUrl(QUrl(url))
 
     ############################################################################
     def open_about(self):
@@ -174,6 +243,7 @@ class FapespGUI(QMainWindow):
             "url_funding": about.__url_funding__,
             "url_bugs": about.__url_bugs__
         }
+        from fapesp_opportunities.modules.wabout import show_about_window
         show_about_window(data,self.icon_path)
 
     ############################################################################
@@ -183,132 +253,321 @@ class FapespGUI(QMainWindow):
         elif os.name == 'posix':  # Linux/macOS
             subprocess.run(['xdg-open', CONFIG_PATH])
 
+    ############################################################################
+    def mostrar(self, resultados):
+        # Só as diferenças em relação à lista atual são aplicadas
+        self.result_model.set_opportunities(resultados)
+
+    def mostrar_resultados(self, resultados):
+        # Só as diferenças entram no índice; a lista mostrada sai dele já ordenada
+        self.prazos.sync(resultados)
+        self.filtrar_local()
+
+    def limites_prazo(self):
+        # (primeiro, último) ordinal de prazo da janela escolhida
+        dias = self.janela_prazo.currentData()
+        if dias is None:
+            return None, None
+        hoje = date.today().toordinal()
+        return hoje, hoje + dias
+
+    def visiveis(self):
+        inicio, fim = self.limites_prazo()
+        return self.prazos.range(inicio, fim)
+
+    def filtrar_local(self):
+        texto = self.filtro_local.text()
+        if not texto.strip():
+            self.mostrar(self.visiveis())
+            self.statusBar().clearMessage()
+            return
+        index = self.ctx.index
+        if index is None:
+            self.statusBar().showMessage("The local index is built by the first search; wait for it to finish.")
+            return
+
+        t0 = time.perf_counter()
+        inicio, fim = self.limites_prazo()
+        encontrados = []
+        for score, op, termos in index.search(texto, limit=200, exclude=self.ctx.hidden.effective()):
+            if (inicio is not None and op.deadline < inicio) or (fim is not None and op.deadline > fim):
+                continue
+            op = fapesp.Opportunity.load(op.dump())
+            op.add_hits(termos)
+            encontrados.append(op)
+        self.mostrar(encontrados)
+        self.statusBar().showMessage(f"{len(encontrados)} of {len(index)} stored opportunities match "
+                                     f"({(time.perf_counter() - t0) * 1000:.1f} ms).")
+
     ############################################################################
     def buscar(self):
-        # Limpa resultados anteriores
-        for i in reversed(range(self.result_layout.count())):
-            widget_to_remove = self.result_layout.itemAt(i).widget()
-            widget_to_remove.setParent(None)
+        # Uma busca nova torna obsoleta a que estiver em andamento
+        self.cancelar()
+        self.search_generation += 1
         
-        try: 
-            resultados = buscar_oportunidades(CONFIG_PATH)
-            L=len(resultados)
-            for i, item in enumerate(resultados,1):
-                self.result_layout.addWidget(self.criar_card(item,i,L))
-        except Exception as e:
-            msg = QMessageBox()
-            msg.setIcon(QMessageBox.Warning) # Ícone de advertência
-            msg.setWindowTitle("Atention")   # Título da janela
-            msg.setText("Error detected!")   # Texto principal
-            msg.setInformativeText(f"{e}")   # Texto adicional opcional
-            msg.setStandardButtons(QMessageBox.Ok | QMessageBox.Cancel)  # Botões padrão
-            msg.setDefaultButton(QMessageBox.Ok)
-            retorno = msg.exec_()
+        worker = SearchWorker(self.search_generation, buscar_oportunidades, CONFIG_PATH,
+                              timings=timing.SearchTimings())
+        worker.signals.progress.connect(self.on_search_progress)
+        worker.signals.partial.connect(self.on_search_partial)
+        worker.signals.finished.connect(self.on_search_finished)
+        worker.signals.failed.connect(self.on_search_failed)
+        worker.signals.cancelled.connect(self.on_search_cancelled)
+        self.workers[self.search_generation] = worker
+        
+        self.btn_cancelar.setEnabled(True)
+        self.statusBar().showMessage("Searching...")
+        self.thread_pool.start(worker)
+
+    ############################################################################
+    def criar_politica(self):
+        conf = self.ctx.config
+        return scheduler.RefreshPolicy(interval=conf["refresh-interval"],
+                                       min_interval=conf["refresh-min-interval"],
+                                       max_interval=conf["refresh-max-interval"])
+
+    def agendar(self, ok, novos=()):
+        # Próxima atualização automática; "refresh-interval" 0 desliga.
+        # ok None: busca cancelada, sem resultado para a política registrar
+        if self.ctx.config["refresh-interval"] <= 0:
+            self.refresh_timer.stop()
+            return
+        proximo = self.prazos.nearest()
+        prazo = proximo.deadline if proximo is not None else None
+        if ok is None:
+            segundos = self.refresh_policy.pending(prazo)
+        else:
+            segundos = self.refresh_policy.record(ok, len(novos), prazo)
+        self.refresh_timer.start(int(segundos * 1000))
+
+    def atualizar(self):
+        # Não interrompe uma busca pedida pelo usuário
+        if self.search_generation in self.workers:
+            self.refresh_timer.start(60 * 1000)
+            return
+        self.buscar()
+        self.auto_generations.add(self.search_generation)
+
+    def avisar_novos(self, novos):
+        if not self.ctx.config["notify-new"]:
+            return
+        titulo = f"{len(novos)} new opportunit{'y' if len(novos) == 1 else 'ies'}"
+        texto = "\n".join(el.title for el in novos[:3]) + ("\n..." if len(novos) > 3 else "")
+        if self.tray.isVisible() and QSystemTrayIcon.supportsMessages():
+            self.tray.showMessage(titulo, texto, QSystemTrayIcon.Information, 10000)
+        else:
+            self.statusBar().showMessage(f"{titulo}: {texto.splitlines()[0]}", 10000)
+
+    def restaurar_janela(self, *args):
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+    ############################################################################
+    def on_config_changed(self, path):
+        # Editores que salvam por rename removem o arquivo da lista observada
+        if path not in self.config_watcher.files() and os.path.exists(path):
+            self.config_watcher.addPath(path)
+        self.ctx.config.reload()
+
+    def on_config_reloaded(self, changed):
+        # Só "avoid_ids" muda quando os ids ocultos são compactados; não precisa buscar de novo
+        if set(changed) - {"avoid_ids"}:
+            self.refresh_policy = self.criar_politica()
+            self.buscar()
+
+    ############################################################################
+    def cancelar(self):
+        worker = self.workers.get(self.search_generation)
+        if worker is not None:
+            worker.cancel()
+            self.statusBar().showMessage("Search cancelled.", 3000)
+        self.btn_cancelar.setEnabled(False)
+
+    ############################################################################
+    def on_search_progress(self, generation, stage, percent):
+        if generation == self.search_generation:
+            self.statusBar().showMessage(f"{stage}... {percent}%")
+
+    def on_search_partial(self, generation, resultados):
+        if generation != self.search_generation:
+            return
+        # Os cartões chegam durante o download; a lista final substitui tudo
+        if self.filtro_local.text().strip():
+            return
+        ocultos = self.ctx.hidden.effective()
+        novos = [el for el in resultados if el.id not in self.prazos and el.id not in ocultos]
+        for el in novos:
+            self.prazos.insert(el)
+        if novos:
+            self.mostrar(self.visiveis())
+
+    def on_search_finished(self, generation, resultados):
+        worker = self.workers.pop(generation, None)
+        if generation != self.search_generation:
+            return
+        self.btn_cancelar.setEnabled(False)
+        timings = worker.kwargs["timings"]
+        with timings.stage("render") as medida:
+            # Itens ocultados enquanto a busca rodava
+            ocultos = self.ctx.hidden.effective()
+            resultados = [el for el in resultados if el.id not in ocultos]
+            self.mostrar_resultados(resultados)
+            medida["items"] = len(resultados)
+        mensagem = f"{len(resultados)} opportunities found in {timings.total:.2f} s."
+        falhas = [fonte for fonte in self.ctx.sources if not fonte.ok]
+        if self.ctx.stale:
+            # Último resultado bom, marcado como desatualizado
+            mensagem = f"Stale results: {self.ctx.stale}"
+        elif falhas:
+            mensagem += f" {len(falhas)} of {len(self.ctx.sources)} sources failed (see the timings tooltip)."
+        paginas = sum(len(fonte.failed_pages) for fonte in self.ctx.sources)
+        if paginas and not self.ctx.stale:
+            mensagem += f" {paginas} listing pages could not be read (see the timings tooltip)."
+        if self.ctx.detail_failures:
+            mensagem += f" {len(self.ctx.detail_failures)} announcement pages could not be downloaded."
+        if self.ctx.config.query_error:
+            mensagem = self.aviso_consulta() + " " + mensagem
+        self.setWindowTitle(about.__program_name__ + (" (stale)" if self.ctx.stale else ""))
+        self.statusBar().showMessage(mensagem)
+        self.mostrar_tempos(timings)
+        timing.log_timings(timings, results=len(resultados), online=True)
+
+        # Só as oportunidades nunca vistas geram aviso, e só nas atualizações automáticas
+        novos = self.novos.update(resultados)
+        if novos and generation in self.auto_generations:
+            self.avisar_novos(novos)
+        self.auto_generations.discard(generation)
+        self.agendar(self.ctx.stale is None, novos)
+
+    def aviso_consulta(self):
+        return f"Invalid query, using the keyword lists: {self.ctx.config.query_error}."
+
+    def mostrar_tempos(self, timings):
+        self.timing_label.setText(timings.summary(["download", "fetch", "parse", "sync", "index", "filter", "details", "render"]))
+        self.timing_label.setToolTip(f"<pre>{html.escape(timings.details())}</pre>")
+
+    def on_search_cancelled(self, generation):
+        self.workers.pop(generation, None)
+        self.auto_generations.discard(generation)
+        # Uma busca mais nova, se houver, agenda a próxima ao terminar
+        if generation == self.search_generation:
+            self.btn_cancelar.setEnabled(False)
+            self.agendar(None)
+
+    def on_search_failed(self, generation, error):
+        self.workers.pop(generation, None)
+        if generation != self.search_generation:
+            return
+        self.btn_cancelar.setEnabled(False)
+        self.agendar(False)
+        if generation in self.auto_generations:
+            # Falha da atualização automática não abre diálogo; tenta de novo mais tarde
+            self.auto_generations.discard(generation)
+            self.statusBar().showMessage(f"Background refresh failed: {error}")
+            return
+        self.statusBar().clearMessage()
+        self.mostrar_erro(error)
+
+    ############################################################################
+    def mostrar_erro(self, e):
+        msg = QMessageBox()
+        msg.setIcon(QMessageBox.Warning) # Ícone de advertência
+        msg.setWindowTitle("Atention")   # Título da janela
+        msg.setText("Error detected!")   # Texto principal
+        msg.setInformativeText(f"{e}")   # Texto adicional opcional
+        msg.setStandardButtons(QMessageBox.Ok | QMessageBox.Cancel)  # Botões padrão
+        msg.setDefaultButton(QMessageBox.Ok)
+        retorno = msg.exec_()
 
     ############################################################################
     def hide_card(self,info):
-        conf = configure.load_config(CONFIG_PATH)
-        conf["avoid_ids"].append(info["id"])
-        
-        configure.save_config(CONFIG_PATH,conf)
-        
-        # Atualiza a lista depois do evento atual
-        QTimer.singleShot(0, self.buscar)
-        
-    def criar_card(self, info,ID,L):
-        card = QFrame()
-        layout = QVBoxLayout(card)
-        layout.setContentsMargins(5, 3, 5, 3)
-        layout.setSpacing(0)
-        common_style = "border: 0px solid #FFFFFF; border-radius: 0px; font-size: 11pt; margin: 0px; padding: 0px;"
-
-        # Linha horizontal para título + botão de menu
-        title_layout = QHBoxLayout()
-        title_layout.setContentsMargins(0,0,0,0)
-
-        # Título
-        str_title = info['title']
-        id_number = info["id"]
-        title = QLabel(f"<b>{ID}/{L} - {str_title} - {id_number}</b>")
-        title.setWordWrap(True)
-        #title.adjustSize()
-        title.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-        title.setTextInteractionFlags(Qt.TextSelectableByMouse)
-        title.setStyleSheet("color: #000000; " + common_style)
-        title_layout.addWidget(title)
-
-        # Botão de menu (pequeno, numa quina)
-        menu_btn = QPushButton("⋮")
-        menu_btn.setFixedSize(20, 20)
-        menu_btn.setStyleSheet("QPushButton { border: none; font-weight: bold; }")
-        menu_btn.setCursor(Qt.PointingHandCursor)
-
-        # Cria menu de contexto
-        menu = QMenu()
+        self.hide_ids([info.id])
+
+    def hide_ids(self, ids):
+        # Remove só da lista em memória; nada é baixado de novo
+        self.ctx.hidden.hide(ids)
+        for id_number in ids:
+            self.prazos.discard(id_number)
+        removidos = self.result_model.remove_ids(ids)
+        if removidos:
+            self.hidden_batches.append(removidos)
+            self.undo_action.setEnabled(True)
+            self.statusBar().showMessage(f"{len(removidos)} hidden. Press {QKeySequence(QKeySequence.Undo).toString()} to undo.", 5000)
+        self.compact_timer.start()
+
+    def undo_hide(self):
+        if not self.hidden_batches:
+            return
+        removidos = self.hidden_batches.pop()
+        self.ctx.hidden.unhide([el.id for el in removidos])
+        for el in removidos:
+            self.prazos.insert(el)
+        self.filtrar_local()
+        self.undo_action.setEnabled(bool(self.hidden_batches))
+        self.compact_timer.start()
+
+    ############################################################################
+    def compactar_ocultos(self, background=True):
+        # Grava "avoid_ids" fora da thread da GUI e descarta ids já vencidos
+        ctx = self.ctx
+        def compact():
+            try:
+                ctx.hidden.compact(expired=ctx.store.expired_ids)
+            except Exception as e:
+                # O diário continua no disco; a próxima compactação tenta de novo
+                logger.warning("Error compacting hidden ids: %s", e)
+                self.compact_failed.emit(str(e))
+        if background:
+            threading.Thread(target=compact, daemon=True).start()
+        else:
+            compact()
+
+    def on_compact_failed(self, error):
+        self.statusBar().showMessage(f"Could not save the hidden opportunities ({error}); they stay in the journal.", 10000)
+
+    def closeEvent(self, event):
+        self.refresh_timer.stop()
+        self.tray.hide()
+        if self.ctx.hidden.pending():
+            self.compactar_ocultos(background=False)
+        self.ctx.config.flush()
+        super().closeEvent(event)
+
+    ############################################################################
+    def mostrar_menu(self, info, global_pos):
+        menu = QMenu(self)
+        action_abrir = menu.addAction("Open link")
+        action_abrir.triggered.connect(lambda checked, info=info: QDesktopServices.openUrl(QUrl(info.link)))
+        action_copiar = menu.addAction("Copy link")
+        action_copiar.triggered.connect(lambda checked, info=info: QApplication.clipboard().setText(info.link))
+        menu.addSeparator()
         action_ocultar = menu.addAction("Hide")
         action_ocultar.triggered.connect(lambda checked, info=info: self.hide_card(info))
+        
+        # Ocultar em lote os cartões selecionados
+        selecionados = [self.result_model.opportunity(idx.row())
+                        for idx in self.result_view.selectionModel().selectedRows()]
+        if len(selecionados) > 1 and info in selecionados:
+            action_lote = menu.addAction(f"Hide {len(selecionados)} selected")
+            action_lote.triggered.connect(lambda checked, ids=[el.id for el in selecionados]: self.hide_ids(ids))
+        menu.exec_(global_pos)
 
-        # Faz botão abrir o menu
-        menu_btn.setMenu(menu)
-
-        title_layout.addWidget(menu_btn, alignment=Qt.AlignRight)
-
-        layout.addLayout(title_layout)
-
-        # Corpo
-        str_link = info["link"]
-        str_body = info["body"]
-        str_all = f'{str_body} <a href="{str_link}">link</a>'
-        str_all = str_all.replace("\n", " ")
-        body = QLabel(str_all)
-        body.setWordWrap(True)
-        body.setOpenExternalLinks(True)
-        #body.adjustSize()
-        ## body.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
-        body.setTextInteractionFlags(Qt.TextSelectableByMouse | Qt.LinksAccessibleByMouse)
-        body.setStyleSheet("color: #333333; background-color: #FFFFFF; " + common_style)
-        layout.addWidget(body)
-
-        # Local
-        location = QLabel(f"<i>{info['city']} - {info['institute']}</i>")
-        location.setWordWrap(True)
-        #location.adjustSize()
-        ## location.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
-        location.setTextInteractionFlags(Qt.TextSelectableByMouse)
-        location.setStyleSheet("color: #333333; background-color: #FFFFFF; " + common_style)
-        layout.addWidget(location)
-
-        # Data final
-        end_date = QLabel(f"<i>End date: {info['end-date']}</i>")
-        end_date.setWordWrap(True)
-        #end_date.adjustSize()
-        ## end_date.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
-        end_date.setTextInteractionFlags(Qt.TextSelectableByMouse)
-        end_date.setStyleSheet("color: #333333; background-color: #FFFFFF; " + common_style)
-        layout.addWidget(end_date)
-
-        card.setStyleSheet("""
-            QFrame {
-                background-color: #f3f3f3;
-                border: 3px solid #ddd;
-                border-radius: 10px;
-                margin: 0px; 
-                padding: 2px;
-            }
-        """)
-
-        card.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-
-        return card
+    def on_context_menu(self, pos):
+        index = self.result_view.indexAt(pos)
+        if index.isValid():
+            self.mostrar_menu(index.data(OpportunityRole), self.result_view.viewport().mapToGlobal(pos))
 
 
     
-def main():
+def main(profiler=None):
+    profiler = profiler or StartupProfiler(enabled="--profile-startup" in sys.argv)
     signal.signal(signal.SIGINT, signal.SIG_DFL)
     
-    create_desktop_directory()    
-    create_desktop_menu()
-    create_desktop_file(os.path.join("~",".local","share","applications"))
+    # Só escreve quando os arquivos não existem
+    with profiler.phase("desktop files"):
+        create_desktop_directory()    
+        create_desktop_menu()
+        create_desktop_file(os.path.join("~",".local","share","applications"))
     
     for n in range(len(sys.argv)):
         if sys.argv[n] == "--autostart":
@@ -322,10 +581,19 @@ def main():
             create_desktop_file(os.path.join("~",".local","share","applications"), overwrite=True)
             return
     
-    app = QApplication(sys.argv)
-    app.setApplicationName(about.__package__) 
-    gui = FapespGUI()
-    gui.show()
+    with profiler.phase("QApplication"):
+        app = QApplication(sys.argv)
+        app.setApplicationName(about.__package__) 
+    with profiler.phase("main window + stored results"):
+        gui = FapespGUI()
+    with profiler.phase("show"):
+        gui.show()
+    
+    # A atualização pela rede começa depois que a janela aparece
+    def first_paint():
+        profiler.mark("first paint")
+        profiler.report()
+    QTimer.singleShot(0, first_paint)
     sys.exit(app.exec_())
 
 
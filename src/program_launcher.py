@@ -32,7 +32,8 @@ os.environ["QT_QPA_PLATFORM_PLUGIN_PATH"] = QLibraryInfo.location(
 )
 
 
-from fapesp_opportunities.program import main
+# Mesma entrada do comando instalado: --headless e --archive também valem no executável
+from fapesp_opportunities.cli import main
 
 if __name__ == "__main__":
     main()
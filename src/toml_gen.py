@@ -55,7 +55,7 @@ dependencies = [
 "Source" = "{__url_source__}"
 
 [project.scripts]
-"{__program_name__}" = "{__package__}.program:main"
+"{__program_name__}" = "{__package__}.cli:main"
 
 [tool.setuptools]
 packages = ["{__package__}", "{__package__}.modules"]